@@ -3,20 +3,15 @@ Interface Streamlit para o Sistema de Detecção de Phishing
 Grings & Filhos LTDA
 """
 
+import gc
+import json
 import os
 import sys
 import streamlit as st
+from collections import deque
 from datetime import datetime
-import nltk
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
-
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
+from itertools import islice
+from string import Template
 
 # ⚡ CORREÇÃO: Adicionar o diretório raiz ao path
 # Obtém o diretório do app (app/) e volta para a raiz (phishing-detector/)
@@ -24,74 +19,310 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, BASE_DIR)
 
 # Agora pode importar normalmente
-from src.modelo import DetectorPhishing
-from src.utils import carregar_modelo
+# (src.modelo / sklearn e nltk são importados só dentro dos loaders em cache)
+import numpy as np
+import config
+
+# Número máximo de análises mantidas no histórico da sessão
+MAX_HISTORICO = 50
+
+# Indicadores de phishing: chave em config.INDICADORES_PHISHING, feature e limiar.
+# Um indicador dispara quando feature > limiar (vale para 1 email ou um lote).
+_IND_KEYS = np.array(['urgencia', 'urls', 'financeiro', 'maiusculas', 'especiais'])
+_IND_FEATS = ('palavras_urgencia', 'num_urls', 'palavras_financeiras', 'prop_maiusculas', 'num_especiais')
+_IND_THR = np.array([0, 0, 0, 0.3, 5])
+
+# Templates HTML do resultado (compilados uma vez, preenchidos com substitute)
+_TPL_RESULTADO = Template("""
+<div class="result-box ${box_class}">
+    <h2 style="margin:0;">${emoji} ${classificacao}</h2>
+    <p style="font-size:1.2rem; margin:0.5rem 0;">
+        <strong>Nível de Risco:</strong> ${nivel_risco}
+    </p>
+    <p style="font-size:1.1rem; margin:0;">
+        <strong>Confiança:</strong> ${confianca}%
+    </p>
+</div>
+""")
+
+_TPL_BARRA = Template("""
+<div class="barra-confianca">
+    <div class="barra-preenchimento" style="width:${pct}%; background-color:${cor};">${pct}%</div>
+</div>
+""")
+
+_TPL_RECOMENDACOES = Template("""
+<div class="recomendacoes">
+    <strong>${emoji} ${titulo}</strong>
+    <ul>${acoes}</ul>
+</div>
+""")
+
+_TPL_METRICA = Template(
+    '<div class="metric-card">'
+    '<div class="metric-label">${rotulo}</div>'
+    '<div class="metric-value">${valor}</div>'
+    '${delta}'
+    '</div>'
+)
+
+_TPL_METRICAS = Template(
+    '<div class="metric-grid" style="grid-template-columns: repeat(${colunas}, 1fr);">${cards}</div>'
+)
+
+_TPL_INDICADOR = Template(
+    '<div class="indicador">'
+    '<div class="indicador-titulo">${emoji} ${nome}</div>'
+    '<div class="indicador-descricao">${descricao}</div>'
+    '</div>'
+)
+
+_TPL_INDICADORES = Template("""
+<div class="indicadores-titulo">🚨 <strong>Indicadores de Phishing Detectados:</strong></div>
+<div class="indicador-grid">${cards}</div>
+""")
+
+# Emails de exemplo da aba 2 (constantes; resultados memorizados em disco)
+_EXEMPLOS = (
+    {
+        "nome": "🚨 Phishing - Conta Suspensa",
+        "texto": "URGENT! Your account will be SUSPENDED immediately! Click here to verify: http://fakephishing.com/verify"
+    },
+    {
+        "nome": "🚨 Phishing - Prêmio Falso",
+        "texto": "Congratulations! You have won $1,000,000! Send your bank details to claim your prize NOW!"
+    },
+    {
+        "nome": "✅ Legítimo - Reunião",
+        "texto": "Hi team, just a reminder that our weekly meeting is scheduled for Tuesday at 2 PM. Please review the attached agenda."
+    },
+    {
+        "nome": "✅ Legítimo - Relatório",
+        "texto": "Dear colleagues, please find attached the quarterly financial report. Let me know if you have any questions."
+    }
+)
 
 # Configuração da página
-st.set_page_config(
-    page_title="Detector de Phishing - Grings & Filhos",
-    page_icon="🛡️",
-    layout="wide",
-    initial_sidebar_state="expanded"
+st.set_page_config(**config.PAGE_CONFIG)
+
+
+@st.cache_resource
+def _css_block():
+    """
+    CSS customizado, já minificado por tools/minify_css.py.
+
+    cache_resource devolve sempre o mesmo objeto (cache_data copiaria a
+    string a cada rerun). O bloco continua sendo emitido em todo rerun:
+    elementos não reemitidos somem da página.
+    """
+    return f"<style>{config._APP_CSS_MIN.decode('utf-8')}</style>"
+
+
+@st.cache_data
+def _header_html():
+    """HTML do cabeçalho."""
+    return (
+        '<h1 class="main-header">🛡️ Sistema de Detecção de Phishing</h1>'
+        '<p class="sub-header">Grings & Filhos LTDA - Protegendo sua comunicação</p>'
+    )
+
+
+@st.cache_data
+def _sobre_markdown():
+    """Texto estático da seção 'Sobre o Sistema' da sidebar."""
+    return """
+        Este sistema utiliza **Machine Learning** para detectar emails de phishing.
+        
+        **Características:**
+        - 🎯 Acurácia: ~94%
+        - ⚡ Análise em tempo real
+        - 🔍 Detecção de padrões suspeitos
+        """
+
+
+@st.cache_data
+def _como_usar_markdown():
+    """Texto estático da seção 'Como Usar' da sidebar."""
+    return """
+        1. Cole o texto do email suspeito
+        2. Clique em **Analisar Email**
+        3. Veja o resultado da análise
+        """
+
+
+@st.cache_data
+def _footer_html():
+    """HTML estático do rodapé (a data é preenchida no navegador)."""
+    return """
+    <div style="text-align: center; color: #666; padding: 1rem;">
+        <p>🛡️ <strong>Grings & Filhos LTDA</strong> - Sistema de Detecção de Phishing v1.0</p>
+    </div>
+    """
+
+
+# Data do rodapé formatada no navegador, no fuso e locale do usuário
+_DATA_CLIENTE_HTML = (
+    '<div style="text-align: center; color: #888; font-size: 0.85rem;">'
+    'Última atualização: <span id="ts"></span></div>'
+    '<script>document.getElementById("ts").textContent = '
+    'new Date().toLocaleDateString("pt-BR");</script>'
 )
 
+
 # CSS customizado
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 2.5rem;
-        color: #1f77b4;
-        text-align: center;
-        margin-bottom: 1rem;
-    }
-    .sub-header {
-        font-size: 1.2rem;
-        color: #666;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    .result-box {
-        padding: 1.5rem;
-        border-radius: 10px;
-        margin: 1rem 0;
-    }
-    .phishing-box {
-        background-color: #ffe6e6;
-        border-left: 5px solid #ff4444;
-    }
-    .safe-box {
-        background-color: #e6f7e6;
-        border-left: 5px solid #44ff44;
-    }
-    .metric-card {
-        background-color: #f0f2f6;
-        padding: 1rem;
-        border-radius: 5px;
-        text-align: center;
-    }
-</style>
-""", unsafe_allow_html=True)
+st.markdown(_css_block(), unsafe_allow_html=True)
 
 
 @st.cache_resource
-def carregar_modelo_cache():
-    """Carrega o modelo uma única vez e mantém em cache."""
-    caminho_modelo = os.path.join(BASE_DIR, 'modelo', 'detector_phishing.pkl')
+def _ensure_nltk():
+    """Garante os recursos do NLTK uma única vez por processo."""
+    # ⚡ Mesma checagem direta no disco do preprocessamento (sem nltk.data.find)
+    from src.preprocessamento import garantir_recursos_nltk
+
+    for pacote in garantir_recursos_nltk():
+        st.warning(f"⚠️ Não foi possível baixar '{pacote}' do NLTK")
+
 
-    if not os.path.exists(caminho_modelo):
-        st.error(f"❌ Modelo não encontrado em: {caminho_modelo}")
+CAMINHO_SAFETENSORS = os.path.join(BASE_DIR, 'modelo', 'detector_phishing.safetensors')
+CAMINHO_MODELO = os.path.join(BASE_DIR, 'modelo', 'detector_phishing.pkl')
+
+
+def _carregar_pkl():
+    """Carrega o modelo completo do .pkl (fallback quando não há safetensors)."""
+    from src.utils import carregar_modelo
+
+    if not os.path.exists(CAMINHO_MODELO):
+        st.error(f"❌ Modelo não encontrado em: {CAMINHO_MODELO}")
         st.info("💡 Execute 'python treinar_modelo.py' primeiro para treinar o modelo")
         st.stop()
 
     try:
-        detector, metadata = carregar_modelo(caminho_modelo)
+        detector, metadata = carregar_modelo(CAMINHO_MODELO)
         return detector  # Retornar apenas o detector, não a tupla
     except Exception as e:
         st.error(f"❌ Erro ao carregar modelo: {e}")
         st.stop()
 
-def exibir_resultado(resultado):
-    """Exibe o resultado da análise de forma visual."""
+
+@st.cache_resource
+def _load_vectorizer():
+    """Carrega preprocessador + TF-IDF (cache separado do classificador)."""
+    from src.modelo import DetectorPhishing
+
+    # ⚡ Preferir safetensors (sem pickle); .pkl fica como fallback
+    if os.path.exists(CAMINHO_SAFETENSORS):
+        try:
+            return DetectorPhishing.carregar_componentes_texto(CAMINHO_SAFETENSORS)
+        except Exception as e:
+            st.warning(f"⚠️ Falha ao carregar safetensors, usando .pkl: {e}")
+
+    detector = _carregar_pkl()
+    return detector.preprocessador, detector.extrator
+
+
+@st.cache_resource
+def _load_classifier():
+    """Carrega scaler + Regressão Logística + métricas."""
+    from src.modelo import DetectorPhishing
+
+    if os.path.exists(CAMINHO_SAFETENSORS):
+        try:
+            return DetectorPhishing.carregar_componentes_classificador(CAMINHO_SAFETENSORS)
+        except Exception as e:
+            st.warning(f"⚠️ Falha ao carregar safetensors, usando .pkl: {e}")
+
+    detector = _carregar_pkl()
+    return detector.scaler, detector.modelo, detector.metricas
+
+
+def carregar_modelo_cache():
+    """
+    Monta o detector a partir dos dois caches.
+    Trocar/descarregar o classificador não descarta o vetorizador.
+    """
+    from src.modelo import DetectorPhishing
+
+    preprocessador, extrator = _load_vectorizer()
+    scaler, modelo, metricas = _load_classifier()
+    return DetectorPhishing.de_componentes(preprocessador, extrator, scaler, modelo, metricas)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _analisar(texto, _detector):
+    """
+    Analisa um email, memorizando o resultado pelo texto.
+
+    Args:
+        texto: Conteúdo do email (única parte da chave do cache)
+        _detector: Detector carregado (prefixo '_' o exclui do hash)
+
+    Returns:
+        Dicionário de resultado de analisar_email (com features)
+    """
+    return _detector.analisar_email(texto, mostrar_features=True)
+
+
+@st.cache_data(persist='disk', show_spinner=False)
+def _analisar_exemplo(idx, _detector, versao_modelo):
+    """
+    Analisa um dos emails de _EXEMPLOS; o resultado persiste em disco.
+
+    Args:
+        idx: Índice do exemplo em _EXEMPLOS
+        _detector: Detector carregado (fora da chave do cache)
+        versao_modelo: Versão do modelo salvo, invalida o cache ao retreinar
+
+    Returns:
+        Dicionário de resultado de analisar_email (com features)
+    """
+    return _detector.analisar_email(_EXEMPLOS[idx]['texto'], mostrar_features=True)
+
+
+def versao_modelo():
+    """Data de modificação do arquivo de modelo em uso (chave de versão)."""
+    caminho = CAMINHO_SAFETENSORS if os.path.exists(CAMINHO_SAFETENSORS) else CAMINHO_MODELO
+    return os.path.getmtime(caminho)
+
+
+def descarregar_modelo():
+    """Remove o classificador e os resultados memorizados do cache e força a coleta de lixo."""
+    _load_classifier.clear()
+    _analisar.clear()
+    gc.collect()
+
+
+def grade_metricas(metricas):
+    """
+    Monta uma linha de cartões de métrica como um único bloco HTML em grid CSS.
+
+    Args:
+        metricas: Lista de tuplas (rótulo, valor) ou (rótulo, valor, delta)
+
+    Returns:
+        HTML da grade de métricas
+    """
+    cards = "".join(
+        _TPL_METRICA.substitute(
+            rotulo=m[0], valor=m[1],
+            delta=f'<div class="metric-delta">{m[2]}</div>' if len(m) > 2 else "")
+        for m in metricas
+    )
+    return _TPL_METRICAS.substitute(colunas=len(metricas), cards=cards)
+
+
+def montar_resultado_html(resultado, estilo=None):
+    """
+    Monta todo o resultado da análise como uma única string HTML.
+
+    Args:
+        resultado: Dicionário retornado por analisar_email
+        estilo: 'detalhado' (card, recomendações, métricas e indicadores) ou
+            'compacto' (apenas card e barra de confiança); padrão config.APP_VARIANT
+
+    Returns:
+        HTML do resultado
+    """
+    compacto = (estilo or config.APP_VARIANT) == 'compacto'
 
     classificacao = resultado['classificacao']
     confianca = resultado['confianca']
@@ -107,54 +338,80 @@ def exibir_resultado(resultado):
         emoji = "✅"
         cor = "#44ff44"
 
-    # Box principal com resultado
-    st.markdown(f"""
-    <div class="result-box {box_class}">
-        <h2 style="margin:0;">{emoji} {classificacao}</h2>
-        <p style="font-size:1.2rem; margin:0.5rem 0;">
-            <strong>Nível de Risco:</strong> {nivel_risco}
-        </p>
-        <p style="font-size:1.1rem; margin:0;">
-            <strong>Confiança:</strong> {confianca * 100:.1f}%
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
-
-    # Métricas adicionais
-    col1, col2, col3 = st.columns(3)
-
-    with col1:
-        st.metric(
-            label="Classificação",
-            value=classificacao,
-            delta="Atenção!" if classificacao == "PHISHING" else "Seguro"
-        )
-
-    with col2:
-        st.metric(
-            label="Confiança",
-            value=f"{confianca * 100:.1f}%"
-        )
-
-    with col3:
-        st.metric(
-            label="Risco",
-            value=nivel_risco
-        )
+    pct = confianca * 100
+
+    # Box principal + barra de confiança
+    html = (
+        _TPL_RESULTADO.substitute(box_class=box_class, emoji=emoji, classificacao=classificacao,
+                                  nivel_risco=nivel_risco, confianca=f"{pct:.1f}")
+        + _TPL_BARRA.substitute(pct=int(round(pct)), cor=cor)
+    )
+    if compacto:
+        return html
+
+    # Recomendações + métricas adicionais
+    recomendacao = config.RECOMENDACOES[nivel_risco]
+    html += _TPL_RECOMENDACOES.substitute(
+        emoji=recomendacao.emoji, titulo=recomendacao.titulo,
+        acoes="".join(f"<li>{acao}</li>" for acao in recomendacao.acoes))
+    html += grade_metricas([
+        ("Classificação", classificacao, "Atenção!" if classificacao == "PHISHING" else "Seguro"),
+        ("Confiança", f"{pct:.1f}%"),
+        ("Risco", nivel_risco),
+    ])
 
     # Indicadores visuais de phishing
-    if 'indicadores_phishing' in resultado and resultado['indicadores_phishing']:
-        st.warning("🚨 **Indicadores de Phishing Detectados:**")
-        for indicador in resultado['indicadores_phishing']:
-            st.markdown(f"- {indicador}")
+    if resultado.get('features'):
+        html += indicadores_html(resultado['features'])
+
+    return html
+
+
+def exibir_resultado(resultado, estilo=None, alvo=None):
+    """
+    Exibe o resultado da análise de forma visual, em um único elemento markdown.
+
+    Args:
+        resultado: Dicionário retornado por analisar_email
+        estilo: Ver montar_resultado_html
+        alvo: Placeholder (st.empty) a sobrescrever; se None, escreve no container atual
+    """
+    (alvo or st).markdown(montar_resultado_html(resultado, estilo), unsafe_allow_html=True)
+
+
+def detectar_indicadores(features):
+    """Retorna as chaves dos indicadores disparados pelas features de um email."""
+    vals = np.fromiter((features[k] for k in _IND_FEATS), dtype=np.float64, count=len(_IND_FEATS))
+    return _IND_KEYS[vals > _IND_THR]
+
+
+def detectar_indicadores_lote(df_features):
+    """
+    Versão em lote: recebe um DataFrame de features (um email por linha)
+    e retorna a máscara booleana (N x 5) de indicadores disparados.
+    """
+    return df_features[list(_IND_FEATS)].to_numpy(dtype=np.float64) > _IND_THR
+
+
+def indicadores_html(features):
+    """HTML dos indicadores de phishing encontrados no email ('' se nenhum)."""
+    chaves = detectar_indicadores(features)
+    if len(chaves) == 0:
+        return ""
+
+    indicadores = [config.INDICADORES_PHISHING[chave] for chave in chaves]
+    cards = "".join(
+        _TPL_INDICADOR.substitute(emoji=ind.emoji, nome=ind.nome, descricao=ind.descricao)
+        for ind in indicadores
+    )
+
+    # Título + grid de duas colunas
+    return _TPL_INDICADORES.substitute(cards=cards)
 
 
 def salvar_analise(texto, resultado):
     """Salva uma análise no histórico."""
     try:
-        from datetime import datetime
-        import json
-
         # Criar registro da análise
         analise = {
             'timestamp': datetime.now().isoformat(),
@@ -164,21 +421,8 @@ def salvar_analise(texto, resultado):
             'nivel_risco': resultado['nivel_risco']
         }
 
-        # Obter histórico atual
-        try:
-            historico_json = st.session_state.get('historico', '[]')
-            historico = json.loads(historico_json) if isinstance(historico_json, str) else historico_json
-        except:
-            historico = []
-
-        # Adicionar nova análise no início
-        historico.insert(0, analise)
-
-        # Manter apenas últimas 50 análises
-        historico = historico[:50]
-
-        # Salvar no session state
-        st.session_state['historico'] = json.dumps(historico)
+        # Adicionar nova análise no início (deque descarta as mais antigas)
+        obter_historico().appendleft(analise)
 
         return True
     except Exception as e:
@@ -187,25 +431,112 @@ def salvar_analise(texto, resultado):
 
 
 def obter_historico():
-    """Obtém o histórico de análises."""
-    try:
-        import json
-        historico_json = st.session_state.get('historico', '[]')
-        return json.loads(historico_json) if isinstance(historico_json, str) else historico_json
-    except:
-        return []
+    """Obtém o histórico de análises (deque com as últimas MAX_HISTORICO)."""
+    return st.session_state.setdefault('historico', deque(maxlen=MAX_HISTORICO))
+
+
+@st.fragment
+def renderizar_resultado_salvo():
+    """
+    Exibe o último resultado salvo em session_state.
+    Como fragmento, interações aqui (ex: expandir detalhes) só reexecutam este bloco.
+    """
+    result_slot = st.empty()
+    resultado = st.session_state.get('ultimo_resultado')
+    if resultado is None:
+        return
+
+    # Card, métricas e indicadores sobrescrevem o mesmo placeholder
+    exibir_resultado(resultado, alvo=result_slot)
+
+    # Mostrar explicação (JSON só é gerado quando o usuário pede)
+    with st.expander("🔍 Ver Detalhes da Análise"):
+        if st.toggle("Mostrar JSON", key='_det_open'):
+            st.code(_resultado_json(resultado), language='json')
+
+
+@st.cache_data
+def _resultado_json(resultado):
+    """Serializa o resultado para exibição (memoizado por conteúdo)."""
+    return json.dumps(resultado, ensure_ascii=False, indent=2)
+
+
+def _itens_historico(historico):
+    """
+    Títulos e corpos (um markdown por expander) das últimas 5 análises.
+
+    Os textos só são remontados quando as últimas análises mudam; a chave
+    (timestamps + classificações) fica em st.session_state['_hist_hash'].
+
+    Args:
+        historico: Deque de análises, da mais recente para a mais antiga
+
+    Returns:
+        Lista de tuplas (titulo, corpo_markdown)
+    """
+    ultimas = list(islice(historico, 5))
+    chave = hash(tuple((a['timestamp'], a['classificacao']) for a in ultimas))
+
+    if st.session_state.get('_hist_hash') != chave:
+        itens = []
+        for analise in ultimas:
+            emoji = "🚨" if analise['classificacao'] == 'PHISHING' else "✅"
+            corpo = (
+                f"**Classificação:** {analise['classificacao']}  \n"
+                f"**Confiança:** {analise['confianca'] * 100:.1f}%  \n"
+                f"**Risco:** {analise['nivel_risco']}  \n"
+                f"**Data:** {analise['timestamp'][:19]}"
+            )
+            itens.append((f"{emoji} {analise['texto'][:40]}...", corpo))
+
+        st.session_state['_hist_hash'] = chave
+        st.session_state['_hist_itens'] = itens
+
+    return st.session_state['_hist_itens']
+
+
+@st.fragment
+def renderizar_historico():
+    """Histórico de análises da sidebar (fragmento independente do resto da página)."""
+    st.header("📋 Histórico Recente")
+    historico = obter_historico()
+
+    if historico:
+        # Mostrar estatísticas do histórico
+        total = len(historico)
+        phishing_count = sum(1 for h in historico if h['classificacao'] == 'PHISHING')
+        legitimo_count = total - phishing_count
+
+        st.markdown(grade_metricas([("Total", total), ("Phishing", phishing_count)]),
+                    unsafe_allow_html=True)
+
+        st.markdown("---")
+
+        # Mostrar últimas 5 análises
+        st.markdown("**Últimas análises:**")
+        for titulo, corpo in _itens_historico(historico):
+            with st.expander(titulo, expanded=False):
+                st.markdown(corpo)
+
+        # Botão para limpar histórico
+        if st.button("🗑️ Limpar Histórico", use_container_width=True):
+            historico.clear()
+            st.rerun(scope="fragment")
+    else:
+        st.info("Nenhuma análise realizada ainda.")
 
 
 def main():
     """Função principal da aplicação."""
 
     # Inicializar session state
-    if 'historico' not in st.session_state:
-        st.session_state['historico'] = '[]'
+    obter_historico()
 
-    # Cabeçalho
-    st.markdown('<h1 class="main-header">🛡️ Sistema de Detecção de Phishing</h1>', unsafe_allow_html=True)
-    st.markdown('<p class="sub-header">Grings & Filhos LTDA - Protegendo sua comunicação</p>', unsafe_allow_html=True)
+    # Cabeçalho (desenhado antes de qualquer import pesado)
+    st.markdown(_header_html(), unsafe_allow_html=True)
+
+    # Recursos do NLTK (verificados apenas na primeira execução)
+    _ensure_nltk()
 
     # Carregar modelo
     with st.spinner("🔄 Carregando modelo de IA..."):
@@ -214,14 +545,7 @@ def main():
     # Sidebar com informações
     with st.sidebar:
         st.header("ℹ️ Sobre o Sistema")
-        st.info("""
-        Este sistema utiliza **Machine Learning** para detectar emails de phishing.
-        
-        **Características:**
-        - 🎯 Acurácia: ~94%
-        - ⚡ Análise em tempo real
-        - 🔍 Detecção de padrões suspeitos
-        """)
+        st.info(_sobre_markdown())
 
         st.header("📊 Estatísticas do Modelo")
         if hasattr(detector, 'metricas') and detector.metricas:
@@ -231,48 +555,16 @@ def main():
             st.metric("Recall", f"{metricas.get('recall', 0) * 100:.2f}%")
 
         st.header("🛠️ Como Usar")
-        st.markdown("""
-        1. Cole o texto do email suspeito
-        2. Clique em **Analisar Email**
-        3. Veja o resultado da análise
-        """)
-
-        # Histórico de análises
-        st.header("📋 Histórico Recente")
-        historico = obter_historico()
-
-        if historico:
-            # Mostrar estatísticas do histórico
-            total = len(historico)
-            phishing_count = sum(1 for h in historico if h['classificacao'] == 'PHISHING')
-            legitimo_count = total - phishing_count
-
-            col1, col2 = st.columns(2)
-            with col1:
-                st.metric("Total", total)
-            with col2:
-                st.metric("Phishing", phishing_count)
-
-            st.markdown("---")
-
-            # Mostrar últimas 5 análises
-            st.markdown("**Últimas análises:**")
-            for i, analise in enumerate(historico[:5]):
-                emoji = "🚨" if analise['classificacao'] == 'PHISHING' else "✅"
-                confianca = analise['confianca'] * 100
+        st.markdown(_como_usar_markdown())
 
-                with st.expander(f"{emoji} {analise['texto'][:40]}...", expanded=False):
-                    st.markdown(f"**Classificação:** {analise['classificacao']}")
-                    st.markdown(f"**Confiança:** {confianca:.1f}%")
-                    st.markdown(f"**Risco:** {analise['nivel_risco']}")
-                    st.markdown(f"**Data:** {analise['timestamp'][:19]}")
-
-            # Botão para limpar histórico
-            if st.button("🗑️ Limpar Histórico", use_container_width=True):
-                st.session_state['historico'] = '[]'
+        with st.expander("⚙️ Administração"):
+            if st.button("♻️ Descarregar modelo", use_container_width=True,
+                         help="Libera o classificador da memória; ele é relido do disco na próxima execução"):
+                descarregar_modelo()
                 st.rerun()
-        else:
-            st.info("Nenhuma análise realizada ainda.")
+
+        # Histórico de análises
+        renderizar_historico()
 
     # Área principal
     st.header("📧 Análise de Email")
@@ -281,22 +573,25 @@ def main():
     tab1, tab2 = st.tabs(["✍️ Inserir Texto", "📋 Exemplos"])
 
     with tab1:
-        # Área de texto para input
-        texto_email = st.text_area(
-            "Cole o conteúdo do email aqui:",
-            height=200,
-            placeholder="Exemplo: URGENT! Your account will be suspended. Click here to verify..."
-        )
+        # Formulário: digitar no texto não dispara rerun, só o envio
+        with st.form('analyze_form'):
+            # Área de texto para input
+            texto_email = st.text_area(
+                "Cole o conteúdo do email aqui:",
+                height=200,
+                placeholder="Exemplo: URGENT! Your account will be suspended. Click here to verify..."
+            )
 
-        col1, col2, col3 = st.columns([1, 1, 2])
+            col1, col2, col3 = st.columns([1, 1, 2])
 
-        with col1:
-            analisar = st.button("🔍 Analisar Email", type="primary", use_container_width=True)
+            with col1:
+                analisar = st.form_submit_button("🔍 Analisar Email", type="primary", use_container_width=True)
 
-        with col2:
-            limpar = st.button("🗑️ Limpar", use_container_width=True)
+            with col2:
+                limpar = st.form_submit_button("🗑️ Limpar", use_container_width=True)
 
         if limpar:
+            st.session_state.pop('ultimo_resultado', None)
             st.rerun()
 
         if analisar:
@@ -305,42 +600,22 @@ def main():
             else:
                 with st.spinner("🔄 Analisando email..."):
                     try:
-                        resultado = detector.analisar_email(texto_email)
-                        exibir_resultado(resultado)
+                        resultado = _analisar(texto_email, detector)
+                        st.session_state['ultimo_resultado'] = resultado
 
                         # Salvar no histórico
                         salvar_analise(texto_email, resultado)
 
-                        # Mostrar explicação
-                        with st.expander("🔍 Ver Detalhes da Análise"):
-                            st.json(resultado)
-
                     except Exception as e:
                         st.error(f"❌ Erro ao analisar email: {e}")
 
+        renderizar_resultado_salvo()
+
     with tab2:
         st.subheader("Exemplos de Emails para Teste")
 
-        exemplos = [
-            {
-                "nome": "🚨 Phishing - Conta Suspensa",
-                "texto": "URGENT! Your account will be SUSPENDED immediately! Click here to verify: http://fakephishing.com/verify"
-            },
-            {
-                "nome": "🚨 Phishing - Prêmio Falso",
-                "texto": "Congratulations! You have won $1,000,000! Send your bank details to claim your prize NOW!"
-            },
-            {
-                "nome": "✅ Legítimo - Reunião",
-                "texto": "Hi team, just a reminder that our weekly meeting is scheduled for Tuesday at 2 PM. Please review the attached agenda."
-            },
-            {
-                "nome": "✅ Legítimo - Relatório",
-                "texto": "Dear colleagues, please find attached the quarterly financial report. Let me know if you have any questions."
-            }
-        ]
-
-        for exemplo in exemplos:
+
+        for idx, exemplo in enumerate(_EXEMPLOS):
             with st.expander(exemplo["nome"]):
                 st.text_area(
                     "Texto do email:",
@@ -352,7 +627,7 @@ def main():
 
                 if st.button(f"Analisar este exemplo", key=f"btn_{exemplo['nome']}"):
                     with st.spinner("🔄 Analisando..."):
-                        resultado = detector.analisar_email(exemplo["texto"])
+                        resultado = _analisar_exemplo(idx, detector, versao_modelo())
                         exibir_resultado(resultado)
 
                         # Salvar no histórico
@@ -360,12 +635,8 @@ def main():
 
     # Rodapé
     st.markdown("---")
-    st.markdown("""
-    <div style="text-align: center; color: #666; padding: 1rem;">
-        <p>🛡️ <strong>Grings & Filhos LTDA</strong> - Sistema de Detecção de Phishing v1.0</p>
-        <p><em>Última atualização: {}</em></p>
-    </div>
-    """.format(datetime.now().strftime("%Y-%m-%d")), unsafe_allow_html=True)
+    st.markdown(_footer_html(), unsafe_allow_html=True)
+    st.html(_DATA_CLIENTE_HTML, unsafe_allow_javascript=True)
 
 
 if __name__ == "__main__":
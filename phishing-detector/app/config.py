@@ -4,6 +4,8 @@ Centraliza constantes, caminhos e parâmetros visuais.
 """
 
 import os
+from dataclasses import dataclass
+from typing import Tuple
 
 # ============================================
 # INFORMAÇÕES DA EMPRESA
@@ -17,6 +19,7 @@ PROJETO_AUTOR = "Matheus Francisco - RA 24001882"
 # ============================================
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 MODELO_PATH = os.path.join(BASE_DIR, 'modelo', 'detector_phishing.pkl')
+MODELO_SAFETENSORS_PATH = os.path.join(BASE_DIR, 'modelo', 'detector_phishing.safetensors')
 LOGO_PATH = os.path.join(BASE_DIR, 'app', 'assets', 'logo.png')
 
 # ============================================
@@ -25,6 +28,12 @@ LOGO_PATH = os.path.join(BASE_DIR, 'app', 'assets', 'logo.png')
 THRESHOLD_RISCO_BAIXO = 0.3
 THRESHOLD_RISCO_MEDIO = 0.7
 
+# ============================================
+# VARIANTE DA INTERFACE
+# ============================================
+# 'detalhado': resultado completo | 'compacto': apenas card e barra de confiança
+APP_VARIANT = os.getenv('APP_VARIANT', 'detalhado')
+
 # ============================================
 # TEXTOS DA INTERFACE
 # ============================================
@@ -78,72 +87,89 @@ Grings & Filhos LTDA
 # ============================================
 # RECOMENDAÇÕES POR NÍVEL DE RISCO
 # ============================================
+@dataclass(frozen=True, slots=True)
+class Recomendacao:
+    """Recomendações exibidas para um nível de risco."""
+    emoji: str
+    titulo: str
+    cor: str
+    acoes: Tuple[str, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class Indicador:
+    """Indicador de phishing exibido na análise."""
+    nome: str
+    descricao: str
+    emoji: str
+
+
 RECOMENDACOES = {
-    'BAIXO': {
-        'emoji': '✅',
-        'titulo': 'Risco Baixo',
-        'cor': 'green',
-        'acoes': [
+    'BAIXO': Recomendacao(
+        emoji='✅',
+        titulo='Risco Baixo',
+        cor='green',
+        acoes=(
             "Email parece seguro, mas mantenha vigilância",
             "Verifique o remetente se solicitar ações importantes",
             "Em caso de dúvida, confirme por outro canal"
-        ]
-    },
-    'MÉDIO': {
-        'emoji': '⚠️',
-        'titulo': 'Risco Médio',
-        'cor': 'orange',
-        'acoes': [
+        )
+    ),
+    'MÉDIO': Recomendacao(
+        emoji='⚠️',
+        titulo='Risco Médio',
+        cor='orange',
+        acoes=(
             "Cuidado! Alguns indicadores suspeitos detectados",
             "NÃO clique em links sem verificar o destino",
             "Confirme a autenticidade com o remetente por telefone",
             "Consulte o setor de TI antes de prosseguir"
-        ]
-    },
-    'ALTO': {
-        'emoji': '🚨',
-        'titulo': 'Risco Alto - PHISHING DETECTADO',
-        'cor': 'red',
-        'acoes': [
+        )
+    ),
+    'ALTO': Recomendacao(
+        emoji='🚨',
+        titulo='Risco Alto - PHISHING DETECTADO',
+        cor='red',
+        acoes=(
             "⛔ NÃO clique em nenhum link ou anexo",
             "⛔ NÃO forneça informações pessoais ou financeiras",
             "⛔ NÃO responda ao email",
             "✅ Exclua o email imediatamente",
             "✅ Reporte ao setor de TI/Segurança",
             "✅ Informe colegas se receberem email similar"
-        ]
-    }
+        )
+    )
 }
 
 # ============================================
 # INDICADORES DE PHISHING
 # ============================================
 INDICADORES_PHISHING = {
-    'urgencia': {
-        'nome': 'Senso de Urgência',
-        'descricao': 'Uso de palavras como "urgente", "imediatamente", "agora"',
-        'emoji': '⏰'
-    },
-    'urls': {
-        'nome': 'Links Suspeitos',
-        'descricao': 'Presença de URLs encurtadas ou domínios desconhecidos',
-        'emoji': '🔗'
-    },
-    'financeiro': {
-        'nome': 'Solicitação Financeira',
-        'descricao': 'Menções a dinheiro, banco, pagamentos, prêmios',
-        'emoji': '💰'
-    },
-    'maiusculas': {
-        'nome': 'Excesso de Maiúsculas',
-        'descricao': 'Uso excessivo de LETRAS MAIÚSCULAS',
-        'emoji': '📢'
-    },
-    'especiais': {
-        'nome': 'Caracteres Especiais',
-        'descricao': 'Muitos caracteres especiais (!!! ??? $$$)',
-        'emoji': '⚡'
-    }
+    'urgencia': Indicador(
+        nome='Senso de Urgência',
+        descricao='Uso de palavras como "urgente", "imediatamente", "agora"',
+        emoji='⏰'
+    ),
+    'urls': Indicador(
+        nome='Links Suspeitos',
+        descricao='Presença de URLs encurtadas ou domínios desconhecidos',
+        emoji='🔗'
+    ),
+    'financeiro': Indicador(
+        nome='Solicitação Financeira',
+        descricao='Menções a dinheiro, banco, pagamentos, prêmios',
+        emoji='💰'
+    ),
+    'maiusculas': Indicador(
+        nome='Excesso de Maiúsculas',
+        descricao='Uso excessivo de LETRAS MAIÚSCULAS',
+        emoji='📢'
+    ),
+    'especiais': Indicador(
+        nome='Caracteres Especiais',
+        descricao='Muitos caracteres especiais (!!! ??? $$$)',
+        emoji='⚡'
+    )
 }
 
 # ============================================
@@ -324,6 +350,106 @@ CUSTOM_CSS = """
 </style>
 """
 
+# ============================================
+# CSS DA APLICAÇÃO (fonte legível)
+# ============================================
+# Após editar, rode `python tools/minify_css.py` para regenerar _APP_CSS_MIN
+APP_CSS = """
+    .main-header {
+        font-size: 2.5rem;
+        color: #1f77b4;
+        text-align: center;
+        margin-bottom: 1rem;
+    }
+    .sub-header {
+        font-size: 1.2rem;
+        color: #666;
+        text-align: center;
+        margin-bottom: 2rem;
+    }
+    .result-box {
+        padding: 1.5rem;
+        border-radius: 10px;
+        margin: 1rem 0;
+    }
+    .phishing-box {
+        background-color: #ffe6e6;
+        border-left: 5px solid #ff4444;
+    }
+    .safe-box {
+        background-color: #e6f7e6;
+        border-left: 5px solid #44ff44;
+    }
+    .metric-card {
+        background-color: #f0f2f6;
+        padding: 1rem;
+        border-radius: 5px;
+        text-align: center;
+    }
+    .metric-grid {
+        display: grid;
+        gap: 1rem;
+        margin: 1rem 0;
+    }
+    .metric-label {
+        color: #666;
+        font-size: 0.9rem;
+    }
+    .metric-value {
+        font-size: 1.6rem;
+        font-weight: bold;
+    }
+    .metric-delta {
+        font-size: 0.85rem;
+        color: #666;
+    }
+    .indicador {
+        background-color: white;
+        padding: 1rem;
+        border-radius: 8px;
+        margin: 0.5rem 0;
+        box-shadow: 0 2px 4px rgba(0,0,0,0.05);
+        border-left: 3px solid #667eea;
+    }
+    .indicador-titulo {
+        font-weight: bold;
+        color: #2c3e50;
+        margin-bottom: 0.3rem;
+    }
+    .indicador-descricao {
+        color: #7f8c8d;
+        font-size: 0.9rem;
+    }
+    .indicador-grid {
+        display: grid;
+        grid-template-columns: repeat(2, 1fr);
+        gap: 0 1rem;
+    }
+    .indicadores-titulo {
+        background-color: #fff3cd;
+        padding: 0.75rem 1rem;
+        border-radius: 5px;
+        margin-top: 1rem;
+    }
+    .barra-confianca {
+        background-color: #e9ecef;
+        border-radius: 10px;
+        height: 30px;
+        overflow: hidden;
+        margin: 1rem 0;
+    }
+    .barra-preenchimento {
+        height: 100%;
+        text-align: center;
+        color: white;
+        font-weight: bold;
+        line-height: 30px;
+    }
+    .recomendacoes ul {
+        margin: 0.5rem 0 1rem 0;
+    }
+"""
+
 # ============================================
 # CONFIGURAÇÕES DE PÁGINA
 # ============================================
@@ -332,4 +458,7 @@ PAGE_CONFIG = {
     'page_icon': '🛡️',
     'layout': 'wide',
     'initial_sidebar_state': 'expanded'
-}
\ No newline at end of file
+}
+# >>> gerado por tools/minify_css.py (não editar)
+_APP_CSS_MIN = b'.main-header{font-size:2.5rem;color:#1f77b4;text-align:center;margin-bottom:1rem}.sub-header{font-size:1.2rem;color:#666;text-align:center;margin-bottom:2rem}.result-box{padding:1.5rem;border-radius:10px;margin:1rem 0}.phishing-box{background-color:#ffe6e6;border-left:5px solid #f44}.safe-box{background-color:#e6f7e6;border-left:5px solid #4f4}.metric-card{background-color:#f0f2f6;padding:1rem;border-radius:5px;text-align:center}.metric-grid{display:grid;gap:1rem;margin:1rem 0}.metric-label{color:#666;font-size:.9rem}.metric-value{font-size:1.6rem;font-weight:bold}.metric-delta{font-size:.85rem;color:#666}.indicador{background-color:white;padding:1rem;border-radius:8px;margin:.5rem 0;box-shadow:0 2px 4px rgba(0,0,0,0.05);border-left:3px solid #667eea}.indicador-titulo{font-weight:bold;color:#2c3e50;margin-bottom:.3rem}.indicador-descricao{color:#7f8c8d;font-size:.9rem}.indicador-grid{display:grid;grid-template-columns:repeat(2,1fr);gap:0 1rem}.indicadores-titulo{background-color:#fff3cd;padding:.75rem 1rem;border-radius:5px;margin-top:1rem}.barra-confianca{background-color:#e9ecef;border-radius:10px;height:30px;overflow:hidden;margin:1rem 0}.barra-preenchimento{height:100%;text-align:center;color:white;font-weight:bold;line-height:30px}.recomendacoes ul{margin:.5rem 0 1rem 0}'
+# <<< fim do bloco gerado
@@ -9,14 +9,12 @@ import argparse
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from src.modelo import DetectorPhishing
-from src.utils import carregar_dataset
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
-from sklearn.metrics import roc_curve, auc, classification_report
 import logging
 
+# matplotlib, sklearn e src.* são importados sob demanda: `--help` e erros
+# de argumentos não pagam o custo dessas importações
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -30,6 +28,9 @@ def plotar_curva_roc(y_true, y_proba, salvar=None):
         y_proba: Probabilidades preditas
         salvar: Caminho para salvar imagem (opcional)
     """
+    import matplotlib.pyplot as plt
+    from sklearn.metrics import roc_curve, auc
+
     fpr, tpr, thresholds = roc_curve(y_true, y_proba)
     roc_auc = auc(fpr, tpr)
 
@@ -63,14 +64,25 @@ def plotar_distribuicao_confianca(y_true, y_proba, salvar=None):
         y_proba: Probabilidades preditas
         salvar: Caminho para salvar imagem
     """
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(12, 6))
 
-    # Separar por classe
-    proba_legitimo = y_proba[y_true == 0]
-    proba_phishing = y_proba[y_true == 1]
+    # Separar por classe (máscara calculada uma única vez)
+    mascara_phishing = np.asarray(y_true) == 1
+    proba_legitimo = y_proba[~mascara_phishing]
+    proba_phishing = y_proba[mascara_phishing]
 
-    plt.hist(proba_legitimo, bins=30, alpha=0.6, label='Legítimo (real)', color='green')
-    plt.hist(proba_phishing, bins=30, alpha=0.6, label='Phishing (real)', color='red')
+    # Binning feito uma vez com NumPy (mesmos 30 bins em [0, 1] para as duas classes);
+    # plt.bar só desenha as contagens, sem copiar as amostras para o matplotlib
+    contagens_legitimo, bordas = np.histogram(proba_legitimo, bins=30, range=(0, 1))
+    contagens_phishing, _ = np.histogram(proba_phishing, bins=30, range=(0, 1))
+    largura = np.diff(bordas)
+
+    plt.bar(bordas[:-1], contagens_legitimo, width=largura, align='edge',
+            alpha=0.6, label='Legítimo (real)', color='green')
+    plt.bar(bordas[:-1], contagens_phishing, width=largura, align='edge',
+            alpha=0.6, label='Phishing (real)', color='red')
 
     plt.axvline(x=0.5, color='black', linestyle='--', linewidth=2,
                 label='Threshold (0.5)')
@@ -139,6 +151,14 @@ def main():
 
     args = parser.parse_args()
 
+    import matplotlib.pyplot as plt
+    from sklearn.metrics import classification_report
+    from src.modelo import DetectorPhishing
+    from src.utils import carregar_dataset
+
+    # Figuras não interativas: cada uma é fechada após salvar para liberar memória
+    plt.ioff()
+
     print("=" * 70)
     print("📊 AVALIAÇÃO DO MODELO DE DETECÇÃO DE PHISHING")
     print("=" * 70 + "\n")
@@ -180,27 +200,27 @@ def main():
 
     # Plotar matriz de confusão
     logger.info("📊 Gerando matriz de confusão...")
-    detector.metricas['matriz_confusao'] = np.array([[
-        ((y_pred == 0) & (labels == 0)).sum(),
-        ((y_pred == 1) & (labels == 0)).sum()
-    ], [
-        ((y_pred == 0) & (labels == 1)).sum(),
-        ((y_pred == 1) & (labels == 1)).sum()
-    ]])
+    # Matriz 2x2 em uma passagem: índice = real * 2 + predito
+    detector.metricas['matriz_confusao'] = np.bincount(
+        labels.values.astype(np.int64) * 2 + y_pred.astype(np.int64), minlength=4
+    ).reshape(2, 2)
 
     detector.plotar_matriz_confusao(
         salvar=os.path.join(args.output_dir, 'matriz_confusao.png')
     )
+    plt.close('all')
 
     # Plotar curva ROC
     logger.info("📈 Gerando curva ROC...")
     plotar_curva_roc(labels, y_proba,
                      salvar=os.path.join(args.output_dir, 'curva_roc.png'))
+    plt.close('all')
 
     # Plotar distribuição de confiança
     logger.info("📊 Gerando distribuição de confiança...")
     plotar_distribuicao_confianca(labels, y_proba,
                                   salvar=os.path.join(args.output_dir, 'distribuicao_confianca.png'))
+    plt.close('all')
 
     # Analisar erros
     analisar_erros(detector, textos.tolist(), labels.values, y_pred, y_proba)
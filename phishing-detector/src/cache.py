@@ -4,83 +4,302 @@ Evita reprocessar emails idênticos múltiplas vezes.
 """
 
 import hashlib
-import pickle
 import os
-from typing import Dict, Optional
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
 import logging
 
+try:
+    import xxhash
+    XXHASH_DISPONIVEL = True
+except ImportError:  # xxhash é opcional: sem ele usa-se blake2b (hashlib)
+    XXHASH_DISPONIVEL = False
+
 logger = logging.getLogger(__name__)
 
+_LIMITE_INT64 = 1 << 63
+
+# Máximo de chaves por SELECT ... IN (...) (limite de parâmetros do SQLite)
+_CHAVES_POR_CONSULTA = 500
+
+# Entradas novas acumuladas antes de gravar no disco automaticamente
+_MAX_PENDENTES = 10000
+
 
 class CachePreprocessamento:
     """
     Cache inteligente para textos preprocessados.
-    Armazena resultados em memória e disco.
+    Mantém as entradas usadas mais recentemente em memória (LRU) e o restante
+    em SQLite (WAL), lido sob demanda: abrir o cache não carrega o disco inteiro.
     """
-    
-    def __init__(self, caminho_cache: str = 'cache/preprocessamento.pkl'):
+
+    # Incrementar quando o preprocessamento mudar: entradas de outras versões
+    # ficam no arquivo mas não são mais lidas (sem precisar apagar o cache)
+    VERSAO = 1
+
+    def __init__(self, caminho_cache: str = 'cache/preprocessamento.sqlite',
+                 tamanho_memoria: int = 10000):
         """
         Inicializa o sistema de cache.
-        
+
         Args:
-            caminho_cache: Onde salvar cache em disco
+            caminho_cache: Arquivo SQLite onde o cache é salvo em disco
+            tamanho_memoria: Máximo de entradas mantidas em memória
         """
         self.caminho_cache = caminho_cache
-        self.cache_memoria: Dict[str, str] = {}
-        
-        # Carregar cache existente do disco
-        self._carregar_cache()
-    
-    def _gerar_hash(self, texto: str) -> str:
-        """Gera hash MD5 do texto para usar como chave."""
-        return hashlib.md5(texto.encode('utf-8')).hexdigest()
-    
-    def _carregar_cache(self) -> None:
-        """Carrega cache do disco se existir."""
-        if os.path.exists(self.caminho_cache):
+        self.tamanho_memoria = tamanho_memoria
+        # Ordem de uso: a primeira entrada é a menos usada recentemente
+        self.cache_memoria: OrderedDict[int, str] = OrderedDict()
+
+        # Entradas novas ainda não gravadas no disco (ver salvar_cache);
+        # gravadas automaticamente ao chegar a _MAX_PENDENTES
+        self._pendentes: Dict[int, str] = {}
+
+        self._conn: Optional[sqlite3.Connection] = None
+        # Protege memória, pendentes e conexão (o app compartilha uma instância
+        # entre sessões); reentrante porque _adicionar_pendente chama salvar_cache
+        self._lock = threading.RLock()
+
+    def __getstate__(self) -> Dict:
+        """Conexão e lock não são serializáveis; o conteúdo vive no SQLite."""
+        return {'caminho_cache': self.caminho_cache, 'tamanho_memoria': self.tamanho_memoria}
+
+    def __setstate__(self, estado: Dict) -> None:
+        """Restaura o cache (inclusive de pickles antigos, baseados em .pkl)."""
+        caminho = estado.get('caminho_cache', 'cache/preprocessamento.sqlite')
+        if caminho.endswith('.pkl'):
+            caminho = os.path.splitext(caminho)[0] + '.sqlite'
+        self.__init__(caminho, estado.get('tamanho_memoria', 10000))
+
+    def _gerar_hash(self, texto: str) -> int:
+        """Gera hash de 64 bits com sinal do texto (xxh3, ou blake2b sem xxhash) para usar como chave."""
+        dados = texto.encode('utf-8')
+        if XXHASH_DISPONIVEL:
+            valor = xxhash.xxh3_64_intdigest(dados, seed=0)
+            # INTEGER do SQLite é int64 com sinal
+            return valor - (1 << 64) if valor >= _LIMITE_INT64 else valor
+        return int.from_bytes(hashlib.blake2b(dados, digest_size=8).digest(), 'little', signed=True)
+
+    def _conectar(self, criar: bool = False) -> Optional[sqlite3.Connection]:
+        """
+        Abre (uma vez) a conexão com o SQLite.
+
+        Args:
+            criar: Se deve criar o arquivo caso ainda não exista
+
+        Returns:
+            Conexão, ou None se o arquivo não existe e criar=False
+        """
+        if self._conn is None:
+            if not criar and not os.path.exists(self.caminho_cache):
+                return None
+
+            diretorio = os.path.dirname(self.caminho_cache)
+            if diretorio:
+                os.makedirs(diretorio, exist_ok=True)
+
+            # Streamlit reexecuta o script em outras threads: chamado sempre com self._lock
+            self._conn = sqlite3.connect(self.caminho_cache, timeout=30, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._criar_tabela(self._conn)
+            logger.info(f"✅ Cache SQLite aberto: {self.caminho_cache}")
+
+        return self._conn
+
+    @staticmethod
+    def _criar_tabela(conn: sqlite3.Connection) -> None:
+        """Cria a tabela do cache, migrando arquivos antigos (sem coluna de versão)."""
+        colunas = [linha[1] for linha in conn.execute('PRAGMA table_info(cache)')]
+        with conn:
+            if colunas and 'versao' not in colunas:
+                # Entradas antigas pertencem à versão 1 do preprocessamento
+                conn.execute('ALTER TABLE cache RENAME TO cache_antigo')
+                colunas = []
+            if not colunas:
+                conn.execute('CREATE TABLE cache (k INTEGER, versao INTEGER, v TEXT, '
+                             'PRIMARY KEY (k, versao)) WITHOUT ROWID')
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'cache_antigo'").fetchone():
+                conn.execute('INSERT OR IGNORE INTO cache (k, versao, v) SELECT k, 1, v FROM cache_antigo')
+                conn.execute('DROP TABLE cache_antigo')
+                logger.info("🔄 Cache SQLite migrado para o formato com versão")
+
+    def _lembrar(self, hash_texto: int, texto_processado: str) -> None:
+        """Guarda a entrada em memória, descartando a menos usada se cheio (com self._lock)."""
+        memoria = self.cache_memoria
+        if hash_texto in memoria:
+            memoria.move_to_end(hash_texto)
+        elif len(memoria) >= self.tamanho_memoria:
+            memoria.popitem(last=False)
+        memoria[hash_texto] = texto_processado
+
+    def _adicionar_pendente(self, hash_texto: int, texto_processado: str) -> None:
+        """Marca a entrada para gravação, gravando no disco se houver pendentes demais (com self._lock)."""
+        self._pendentes[hash_texto] = texto_processado
+        if len(self._pendentes) >= _MAX_PENDENTES:
+            self.salvar_cache()
+
+    def salvar_cache(self) -> None:
+        """Grava no disco apenas as entradas novas desde o último salvamento."""
+        with self._lock:
+            if not self._pendentes:
+                return
+            # Grava um snapshot: entradas novas vão para o dict novo, não se perdem
+            pendentes, self._pendentes = self._pendentes, {}
             try:
-                with open(self.caminho_cache, 'rb') as f:
-                    self.cache_memoria = pickle.load(f)
-                logger.info(f"✅ Cache carregado: {len(self.cache_memoria)} entradas")
+                conn = self._conectar(criar=True)
+                with conn:
+                    conn.executemany('INSERT OR REPLACE INTO cache (k, versao, v) VALUES (?, ?, ?)',
+                                     ((k, self.VERSAO, v) for k, v in pendentes.items()))
+                logger.info(f"💾 Cache salvo: {len(pendentes)} entradas novas")
             except Exception as e:
-                logger.warning(f"⚠️ Erro ao carregar cache: {e}")
-                self.cache_memoria = {}
-    
-    def salvar_cache(self) -> None:
-        """Salva cache em disco."""
-        os.makedirs(os.path.dirname(self.caminho_cache), exist_ok=True)
-        try:
-            with open(self.caminho_cache, 'wb') as f:
-                pickle.dump(self.cache_memoria, f)
-            logger.info(f"💾 Cache salvo: {len(self.cache_memoria)} entradas")
-        except Exception as e:
-            logger.error(f"❌ Erro ao salvar cache: {e}")
-    
+                logger.error(f"❌ Erro ao salvar cache: {e}")
+                # Mantém as entradas para a próxima tentativa
+                pendentes.update(self._pendentes)
+                self._pendentes = pendentes
+
     def obter(self, texto: str) -> Optional[str]:
         """
-        Busca texto preprocessado no cache.
-        
+        Busca texto preprocessado no cache (memória, depois disco).
+
         Returns:
             Texto preprocessado ou None se não encontrado
         """
         hash_texto = self._gerar_hash(texto)
-        return self.cache_memoria.get(hash_texto)
-    
+
+        with self._lock:
+            resultado = self.cache_memoria.get(hash_texto)
+            if resultado is not None:
+                self.cache_memoria.move_to_end(hash_texto)
+                return resultado
+            resultado = self._pendentes.get(hash_texto)
+            if resultado is not None:
+                return resultado
+
+            try:
+                conn = self._conectar()
+                if conn is None:
+                    return None
+                linha = conn.execute('SELECT v FROM cache WHERE k = ? AND versao = ?',
+                                     (hash_texto, self.VERSAO)).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Erro ao ler cache: {e}")
+                return None
+
+            if linha is None:
+                return None
+
+            self._lembrar(hash_texto, linha[0])
+            return linha[0]
+
     def adicionar(self, texto_original: str, texto_processado: str) -> None:
-        """Adiciona entrada ao cache."""
+        """Adiciona entrada ao cache (gravada no disco em salvar_cache)."""
         hash_texto = self._gerar_hash(texto_original)
-        self.cache_memoria[hash_texto] = texto_processado
-    
+        with self._lock:
+            self._lembrar(hash_texto, texto_processado)
+            self._adicionar_pendente(hash_texto, texto_processado)
+
+    def obter_muitos(self, textos: List[str]) -> List[Optional[str]]:
+        """
+        Busca vários textos de uma vez: memória primeiro e, para o que faltar,
+        uma consulta SQLite por bloco de chaves (em vez de uma por texto).
+
+        Args:
+            textos: Textos originais
+
+        Returns:
+            Lista alinhada com `textos` (None onde não há entrada no cache)
+        """
+        gerar_hash = self._gerar_hash
+        chaves = [gerar_hash(texto) for texto in textos]
+
+        with self._lock:
+            memoria, pendentes = self.cache_memoria, self._pendentes
+            resultados = [memoria.get(k, pendentes.get(k)) for k in chaves]
+
+            # Acertos em memória passam a ser os mais recentes da LRU
+            for k in chaves:
+                if k in memoria:
+                    memoria.move_to_end(k)
+
+            faltantes = list({k for k, r in zip(chaves, resultados) if r is None})
+            if not faltantes:
+                return resultados
+
+            try:
+                encontrados = self._consultar_disco(faltantes)
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Erro ao ler cache: {e}")
+                return resultados
+
+            for k, v in encontrados.items():
+                self._lembrar(k, v)
+
+        return [r if r is not None else encontrados.get(k)
+                for k, r in zip(chaves, resultados)]
+
+    def _consultar_disco(self, chaves: List[int]) -> Dict[int, str]:
+        """
+        Busca no SQLite as chaves da versão atual, um SELECT ... IN (...) por
+        bloco de chaves (com self._lock).
+
+        Returns:
+            Dicionário chave -> texto processado (só as encontradas)
+        """
+        conn = self._conectar()
+        if conn is None:
+            return {}
+
+        encontrados = {}
+        for i in range(0, len(chaves), _CHAVES_POR_CONSULTA):
+            bloco = chaves[i:i + _CHAVES_POR_CONSULTA]
+            marcadores = ','.join('?' * len(bloco))
+            encontrados.update(conn.execute(
+                f'SELECT k, v FROM cache WHERE versao = ? AND k IN ({marcadores})',
+                [self.VERSAO, *bloco]
+            ))
+        return encontrados
+
+    def adicionar_muitos(self, textos_originais: List[str], textos_processados: List[str]) -> None:
+        """Adiciona várias entradas ao cache (gravadas no disco em salvar_cache)."""
+        gerar_hash = self._gerar_hash
+        chaves = [gerar_hash(original) for original in textos_originais]
+        with self._lock:
+            for hash_texto, processado in zip(chaves, textos_processados):
+                self._lembrar(hash_texto, processado)
+                self._adicionar_pendente(hash_texto, processado)
+
     def limpar(self) -> None:
         """Limpa todo o cache."""
-        self.cache_memoria.clear()
-        if os.path.exists(self.caminho_cache):
-            os.remove(self.caminho_cache)
+        with self._lock:
+            self.cache_memoria.clear()
+            self._pendentes.clear()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            for sufixo in ('', '-wal', '-shm'):
+                if os.path.exists(self.caminho_cache + sufixo):
+                    os.remove(self.caminho_cache + sufixo)
         logger.info("🗑️ Cache limpo")
-    
+
     def estatisticas(self) -> Dict:
         """Retorna estatísticas do cache."""
+        with self._lock:
+            conn = self._conectar()
+            em_disco = conn.execute('SELECT COUNT(*) FROM cache WHERE versao = ?',
+                                    (self.VERSAO,)).fetchone()[0] if conn else 0
+            # Pendentes já gravados (INSERT OR REPLACE) não contam duas vezes
+            pendentes = list(self._pendentes)
+            so_pendentes = len(pendentes) - len(self._consultar_disco(pendentes))
+            em_memoria = len(self.cache_memoria)
+
+        tamanho = sum(os.path.getsize(self.caminho_cache + sufixo)
+                      for sufixo in ('', '-wal')
+                      if os.path.exists(self.caminho_cache + sufixo))
         return {
-            'total_entradas': len(self.cache_memoria),
-            'tamanho_mb': len(pickle.dumps(self.cache_memoria)) / (1024 * 1024)
+            'total_entradas': em_disco + so_pendentes,
+            'em_memoria': em_memoria,
+            'tamanho_mb': tamanho / (1024 * 1024)
         }
@@ -4,14 +4,110 @@ Transforma texto em características numéricas para o modelo de ML.
 """
 
 import re
+import heapq
+from collections import Counter
 import numpy as np
 import pandas as pd
-from typing import List, Dict
-from sklearn.feature_extraction.text import TfidfVectorizer
+from typing import List, Dict, Tuple, Union
+from scipy.sparse import csr_matrix, hstack, vstack
+from joblib import Parallel, delayed, effective_n_jobs
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
+from sklearn.preprocessing import normalize
+from sklearn.utils.sparsefuncs_fast import inplace_csr_row_normalize_l2
 import logging
 
+try:
+    from numba import njit
+    NUMBA_DISPONIVEL = True
+except ImportError:  # Numba é opcional: sem ele usa-se o caminho Python puro
+    NUMBA_DISPONIVEL = False
+
+    def njit(*args, **kwargs):
+        """Substituto sem efeito para @njit quando o Numba não está instalado."""
+        def decorador(func):
+            return func
+        return decorador
+
 logger = logging.getLogger(__name__)
 
+# Palavras-chave de urgência comuns em phishing
+PALAVRAS_URGENCIA = (
+    'urgent', 'immediately', 'now', 'expire', 'suspended',
+    'verify', 'confirm', 'click', 'act', 'limited', 'hurry'
+)
+
+# Palavras relacionadas a dinheiro/finanças
+PALAVRAS_FINANCEIRAS = (
+    'money', 'bank', 'account', 'credit', 'card', 'payment',
+    'invoice', 'transfer', 'wire', 'dollar', 'prize', 'winner'
+)
+
+
+# Tamanho mínimo de lote para dividir a extração de features entre processos
+MIN_TEXTOS_PARALELO = 2000
+
+# Padrões das features manuais (compilados uma vez; .pattern vai para Series.str.count)
+RE_URL = re.compile(r'http[s]?://|URL_TOKEN|www\.')
+RE_ESPECIAIS = re.compile(r'[!?$%&*@#]')
+
+# Colunas TF-IDF no modo hashing (sem vocabulário: memória constante)
+N_FEATURES_HASHING = 2 ** 18
+
+# Colunas das features manuais, na ordem em que entram na matriz do modelo
+COLUNAS_MANUAIS = ('num_urls', 'prop_maiusculas', 'num_especiais',
+                   'palavras_urgencia', 'palavras_financeiras', 'tamanho_texto')
+
+
+def _contar_palavras(texto_lower: str, palavras) -> int:
+    """Quantas palavras distintas da lista aparecem (como substring) no texto."""
+    return sum(1 for palavra in palavras if palavra in texto_lower)
+
+
+def _contar_letras_lote(textos: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Conta letras e maiúsculas de vários textos numa única passagem NumPy.
+
+    Os textos são codificados juntos em um buffer UTF-32 (um code point por
+    posição) e as contagens por documento saem de np.add.reduceat nos
+    offsets de cada texto. Faixas ASCII usam máscaras; os code points
+    não-ASCII distintos são classificados uma vez cada por isalpha/isupper,
+    preservando a semântica Unicode.
+
+    Args:
+        textos: Lista de textos originais
+
+    Returns:
+        Tupla (letras, maiusculas) com um inteiro por texto
+    """
+    n = len(textos)
+    tamanhos = np.fromiter(map(len, textos), dtype=np.int64, count=n)
+    inicios = np.cumsum(tamanhos) - tamanhos
+
+    cp = np.frombuffer(''.join(textos).encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    # 'A'..'Z' e 'a'..'z' com uma comparação cada (uint32 dá a volta abaixo de 65/97)
+    maiusculas = (cp - 65) < 26
+    letras = maiusculas | ((cp - 97) < 26)
+
+    fora_ascii = cp >= 128
+    if fora_ascii.any():
+        valores, inverso = np.unique(cp[fora_ascii], return_inverse=True)
+        caracteres = [chr(v) for v in valores.tolist()]
+        e_letra = np.fromiter((c.isalpha() for c in caracteres), dtype=bool, count=len(caracteres))
+        e_maiuscula = np.fromiter((c.isalpha() and c.isupper() for c in caracteres),
+                                  dtype=bool, count=len(caracteres))
+        letras[fora_ascii] = e_letra[inverso]
+        maiusculas[fora_ascii] = e_maiuscula[inverso]
+
+    # Soma por documento; reduceat não aceita segmentos vazios, que ficam com 0
+    total_letras = np.zeros(n, dtype=np.int64)
+    total_maiusculas = np.zeros(n, dtype=np.int64)
+    nao_vazios = tamanhos > 0
+    if nao_vazios.any():
+        total_letras[nao_vazios] = np.add.reduceat(letras, inicios[nao_vazios], dtype=np.int64)
+        total_maiusculas[nao_vazios] = np.add.reduceat(maiusculas, inicios[nao_vazios], dtype=np.int64)
+
+    return total_letras, total_maiusculas
+
 
 class ExtratorFeatures:
     """
@@ -19,41 +115,54 @@ class ExtratorFeatures:
     Combina TF-IDF com features manuais específicas de phishing.
     """
 
-    def __init__(self, max_features: int = 3000, ngram_range: tuple = (1, 2)):
+    # Extratores salvos antes da opção de hashing usam vocabulário
+    usar_hashing = False
+
+    def __init__(self, max_features: int = 3000, ngram_range: tuple = (1, 2),
+                 dtype: type = np.float32, usar_hashing: bool = False):
         """
         Inicializa o extrator de features.
 
         Args:
-            max_features: Número máximo de features TF-IDF
+            max_features: Número máximo de features TF-IDF (ignorado com hashing)
             ngram_range: Tupla (min, max) para n-gramas (ex: (1,2) = unigramas e bigramas)
+            dtype: Tipo das matrizes de features (float32 usa metade da memória)
+            usar_hashing: Se True, usa HashingVectorizer + TfidfTransformer
+                (memória constante, sem nomes das palavras)
         """
         self.max_features = max_features
         self.ngram_range = ngram_range
-
-        # Vetorizador TF-IDF
-        self.vectorizer = TfidfVectorizer(
-            max_features=max_features,
-            ngram_range=ngram_range,
-            min_df=2,  # Palavra deve aparecer em pelo menos 2 documentos
-            max_df=0.8,  # Palavra não pode aparecer em mais de 80% dos documentos
-            sublinear_tf=True  # Usar escala log para TF
-        )
-
-        # Palavras-chave de urgência comuns em phishing
-        self.palavras_urgencia = [
-            'urgent', 'immediately', 'now', 'expire', 'suspended',
-            'verify', 'confirm', 'click', 'act', 'limited', 'hurry'
-        ]
-
-        # Palavras relacionadas a dinheiro/finanças
-        self.palavras_financeiras = [
-            'money', 'bank', 'account', 'credit', 'card', 'payment',
-            'invoice', 'transfer', 'wire', 'dollar', 'prize', 'winner'
-        ]
+        self.usar_hashing = usar_hashing
+
+        if usar_hashing:
+            # Contagens por bucket de hash; o IDF é aprendido à parte
+            self.vectorizer = HashingVectorizer(
+                n_features=N_FEATURES_HASHING,
+                ngram_range=ngram_range,
+                alternate_sign=False,
+                norm=None,
+                dtype=dtype
+            )
+            self.transformador_tfidf = TfidfTransformer(sublinear_tf=True)
+        else:
+            # Vetorizador TF-IDF
+            self.vectorizer = TfidfVectorizer(
+                max_features=max_features,
+                ngram_range=ngram_range,
+                min_df=2,  # Palavra deve aparecer em pelo menos 2 documentos
+                max_df=0.8,  # Palavra não pode aparecer em mais de 80% dos documentos
+                sublinear_tf=True,  # Usar escala log para TF
+                dtype=dtype
+            )
+
+        # Palavras-chave de urgência e financeiras
+        self.palavras_urgencia = list(PALAVRAS_URGENCIA)
+        self.palavras_financeiras = list(PALAVRAS_FINANCEIRAS)
 
         logger.info(f"✅ Extrator de features inicializado (max_features={max_features})")
 
-    def contar_urls(self, texto: str) -> int:
+    @staticmethod
+    def contar_urls(texto: str) -> int:
         """
         Conta número de URLs no texto.
 
@@ -63,11 +172,10 @@ class ExtratorFeatures:
         Returns:
             Número de URLs encontradas
         """
-        padrao_url = r'http[s]?://|URL_TOKEN|www\.'
-        urls = re.findall(padrao_url, texto.lower())
-        return len(urls)
+        return len(RE_URL.findall(texto.lower()))
 
-    def proporcao_maiusculas(self, texto: str) -> float:
+    @staticmethod
+    def proporcao_maiusculas(texto: str) -> float:
         """
         Calcula proporção de letras maiúsculas (indicador de spam/phishing).
 
@@ -80,14 +188,14 @@ class ExtratorFeatures:
         if not texto:
             return 0.0
 
-        letras = [c for c in texto if c.isalpha()]
-        if not letras:
+        letras, maiusculas = _contar_letras_lote([texto])
+        if not letras[0]:
             return 0.0
 
-        maiusculas = sum(1 for c in letras if c.isupper())
-        return maiusculas / len(letras)
+        return int(maiusculas[0]) / int(letras[0])
 
-    def contar_caracteres_especiais(self, texto: str) -> int:
+    @staticmethod
+    def contar_caracteres_especiais(texto: str) -> int:
         """
         Conta caracteres especiais (!?$% etc).
 
@@ -97,8 +205,25 @@ class ExtratorFeatures:
         Returns:
             Número de caracteres especiais
         """
-        especiais = r'[!?$%&*@#]'
-        return len(re.findall(especiais, texto))
+        return len(RE_ESPECIAIS.findall(texto))
+
+    def contar_palavras_chave(self, texto: str) -> Dict[str, int]:
+        """
+        Conta palavras de urgência e financeiras de uma vez (uma única conversão
+        para minúsculas).
+
+        Args:
+            texto: Texto do email
+
+        Returns:
+            Dicionário {'urgencia': n, 'financeiras': n} com o número de palavras
+            distintas de cada lista presentes no texto
+        """
+        texto_lower = texto.lower()
+        return {
+            'urgencia': _contar_palavras(texto_lower, self.palavras_urgencia),
+            'financeiras': _contar_palavras(texto_lower, self.palavras_financeiras)
+        }
 
     def detectar_palavras_urgencia(self, texto: str) -> int:
         """
@@ -110,8 +235,7 @@ class ExtratorFeatures:
         Returns:
             Número de palavras de urgência encontradas
         """
-        texto_lower = texto.lower()
-        return sum(1 for palavra in self.palavras_urgencia if palavra in texto_lower)
+        return _contar_palavras(texto.lower(), self.palavras_urgencia)
 
     def detectar_palavras_financeiras(self, texto: str) -> int:
         """
@@ -123,10 +247,10 @@ class ExtratorFeatures:
         Returns:
             Número de palavras financeiras encontradas
         """
-        texto_lower = texto.lower()
-        return sum(1 for palavra in self.palavras_financeiras if palavra in texto_lower)
+        return _contar_palavras(texto.lower(), self.palavras_financeiras)
 
-    def tamanho_texto(self, texto: str) -> int:
+    @staticmethod
+    def tamanho_texto(texto: str) -> int:
         """
         Retorna número de palavras no texto.
 
@@ -138,10 +262,54 @@ class ExtratorFeatures:
         """
         return len(texto.split())
 
+    def extrair_features_manuais_array(self, textos: List[str],
+                                       textos_originais: List[str] = None,
+                                       dtype: type = np.float64) -> np.ndarray:
+        """
+        Extrai features manuais (não TF-IDF) direto num array NumPy,
+        preenchido coluna a coluna, na ordem de COLUNAS_MANUAIS.
+
+        Args:
+            textos: Lista de textos preprocessados
+            textos_originais: Lista de textos originais (para proporção de maiúsculas)
+            dtype: Tipo do array de saída
+
+        Returns:
+            Array (n_textos, 6) com features manuais
+        """
+        textos = list(textos)
+        textos_originais = textos if textos_originais is None else list(textos_originais)
+        n = len(textos)
+        textos_lower = [t.lower() for t in textos]
+
+        saida = np.empty((n, len(COLUNAS_MANUAIS)), dtype=dtype)
+
+        saida[:, 0] = np.fromiter((len(RE_URL.findall(t)) for t in textos_lower),
+                                  dtype=np.int64, count=n)
+
+        # Proporção de maiúsculas: uma passagem NumPy pelos code points de todo o lote
+        letras, maiusculas = _contar_letras_lote(textos_originais)
+        saida[:, 1] = np.divide(maiusculas, letras, out=np.zeros(n), where=letras > 0)
+
+        saida[:, 2] = np.fromiter((len(RE_ESPECIAIS.findall(t)) for t in textos_originais),
+                                  dtype=np.int64, count=n)
+
+        # Palavras-chave: quantas palavras distintas de cada lista aparecem no texto
+        # (o operador `in` é mais rápido que um Series.str.contains por palavra)
+        saida[:, 3] = np.fromiter((_contar_palavras(t, self.palavras_urgencia) for t in textos_lower),
+                                  dtype=np.int64, count=n)
+        saida[:, 4] = np.fromiter((_contar_palavras(t, self.palavras_financeiras) for t in textos_lower),
+                                  dtype=np.int64, count=n)
+
+        saida[:, 5] = np.fromiter((len(t.split()) for t in textos), dtype=np.int64, count=n)
+
+        return saida
+
     def extrair_features_manuais(self, textos: List[str],
                                  textos_originais: List[str] = None) -> pd.DataFrame:
         """
         Extrai features manuais (não TF-IDF) de uma lista de textos.
+        Versão DataFrame de extrair_features_manuais_array (para inspeção).
 
         Args:
             textos: Lista de textos preprocessados
@@ -150,22 +318,9 @@ class ExtratorFeatures:
         Returns:
             DataFrame com features manuais
         """
-        if textos_originais is None:
-            textos_originais = textos
-
-        features = []
-
-        for texto, original in zip(textos, textos_originais):
-            features.append({
-                'num_urls': self.contar_urls(texto),
-                'prop_maiusculas': self.proporcao_maiusculas(original),
-                'num_especiais': self.contar_caracteres_especiais(original),
-                'palavras_urgencia': self.detectar_palavras_urgencia(texto),
-                'palavras_financeiras': self.detectar_palavras_financeiras(texto),
-                'tamanho_texto': self.tamanho_texto(texto)
-            })
-
-        return pd.DataFrame(features)
+        df = pd.DataFrame(self.extrair_features_manuais_array(textos, textos_originais),
+                          columns=list(COLUNAS_MANUAIS))
+        return df.astype({coluna: np.int32 for coluna in COLUNAS_MANUAIS if coluna != 'prop_maiusculas'})
 
     def treinar_tfidf(self, textos: List[str]) -> None:
         """
@@ -175,12 +330,19 @@ class ExtratorFeatures:
             textos: Lista de textos preprocessados para treino
         """
         logger.info(f"Treinando TF-IDF com {len(textos)} textos...")
+
+        if self.usar_hashing:
+            self.transformador_tfidf.fit(self.vectorizer.transform(textos))
+            logger.info(f"✅ TF-IDF (hashing) treinado! {N_FEATURES_HASHING} buckets")
+            return
+
         self.vectorizer.fit(textos)
+        self._termos = None
 
         vocab_size = len(self.vectorizer.vocabulary_)
         logger.info(f"✅ TF-IDF treinado! Vocabulário: {vocab_size} termos")
 
-    def transformar_tfidf(self, textos: List[str]) -> np.ndarray:
+    def transformar_tfidf(self, textos: List[str]) -> csr_matrix:
         """
         Transforma textos em features TF-IDF.
 
@@ -188,38 +350,86 @@ class ExtratorFeatures:
             textos: Lista de textos preprocessados
 
         Returns:
-            Matriz TF-IDF (sparse matrix convertida para array)
+            Matriz TF-IDF esparsa (CSR)
         """
-        return self.vectorizer.transform(textos).toarray()
+        vectorizer = self.vectorizer
+        if self.usar_hashing:
+            return self.transformador_tfidf.transform(vectorizer.transform(textos))
+        if not hasattr(vectorizer, 'vocabulary_') or vectorizer.binary:
+            return vectorizer.transform(textos)
+        return _tfidf_vocabulario(vectorizer, textos)
 
     def extrair_features_completas(self, textos: List[str],
-                                   textos_originais: List[str] = None) -> np.ndarray:
+                                   textos_originais: List[str] = None,
+                                   dense: bool = False,
+                                   n_jobs: int = -1) -> Union[csr_matrix, np.ndarray]:
         """
         Extrai TODAS as features (TF-IDF + manuais) de uma vez.
 
+        Lotes com pelo menos MIN_TEXTOS_PARALELO textos são divididos em blocos
+        processados em paralelo (joblib); os resultados são idênticos ao serial.
+
         Args:
             textos: Lista de textos preprocessados
             textos_originais: Lista de textos originais
+            dense: Se True, retorna array denso (para estimadores que não aceitam sparse)
+            n_jobs: Número de processos para lotes grandes (-1 = todos os núcleos)
 
         Returns:
-            Array numpy com todas as features concatenadas
+            Matriz CSR (ou array numpy, se dense=True) com todas as features concatenadas
         """
         logger.info(f"Extraindo features de {len(textos)} textos...")
 
-        # Features TF-IDF
-        features_tfidf = self.transformar_tfidf(textos)
-        logger.debug(f"TF-IDF shape: {features_tfidf.shape}")
+        textos = list(textos)
+        textos_originais = textos if textos_originais is None else list(textos_originais)
+        num_workers = effective_n_jobs(n_jobs)
+
+        if num_workers > 1 and len(textos) >= MIN_TEXTOS_PARALELO:
+            # ⚡ Um bloco por worker; TF-IDF empilhado com vstack, manuais com concat
+            logger.info(f"🚀 Extraindo features em {num_workers} processos paralelos")
+            limites = np.array_split(np.arange(len(textos)), num_workers)
+            blocos = Parallel(n_jobs=num_workers)(
+                delayed(_extrair_bloco)(self, textos[idx[0]:idx[-1] + 1],
+                                        textos_originais[idx[0]:idx[-1] + 1])
+                for idx in limites if len(idx)
+            )
+            features_tfidf = vstack([tfidf for tfidf, _ in blocos], format='csr')
+            features_manuais = np.vstack([manuais for _, manuais in blocos])
+        else:
+            features_tfidf, features_manuais = _extrair_bloco(self, textos, textos_originais)
 
-        # Features manuais
-        features_manuais = self.extrair_features_manuais(textos, textos_originais)
+        logger.debug(f"TF-IDF shape: {features_tfidf.shape}")
         logger.debug(f"Features manuais shape: {features_manuais.shape}")
 
-        # Concatenar horizontalmente
-        features_completas = np.hstack([features_tfidf, features_manuais.values])
+        # Concatenar horizontalmente (TF-IDF continua esparso, salvo se pedido denso),
+        # no dtype do vetorizador: modelos antigos (pickle) seguem em float64
+        if dense:
+            features_completas = np.hstack([features_tfidf.toarray(), features_manuais])
+        else:
+            features_completas = hstack([features_tfidf, csr_matrix(features_manuais)], format='csr')
 
         logger.info(f"✅ Features extraídas! Shape final: {features_completas.shape}")
         return features_completas
 
+    def termos_por_indice(self) -> Union[np.ndarray, None]:
+        """
+        Termo de cada coluna TF-IDF (vocabulário invertido), calculado uma vez
+        por treino e reaproveitado.
+
+        Returns:
+            Array de termos indexado pela coluna, ou None no modo hashing
+        """
+        if self.usar_hashing:
+            return None
+
+        termos = getattr(self, '_termos', None)
+        if termos is None:
+            vocab = self.vectorizer.vocabulary_
+            termos = np.empty(len(vocab), dtype=object)
+            termos[np.fromiter(vocab.values(), dtype=np.int64, count=len(vocab))] = list(vocab)
+            self._termos = termos
+        return termos
+
     def obter_features_mais_importantes(self, top_n: int = 20) -> List[tuple]:
         """
         Retorna as N palavras mais importantes do vocabulário TF-IDF.
@@ -230,14 +440,75 @@ class ExtratorFeatures:
         Returns:
             Lista de tuplas (termo, índice)
         """
+        if self.usar_hashing:
+            raise ValueError("Modo hashing não guarda vocabulário: nomes dos termos indisponíveis")
         if not hasattr(self.vectorizer, 'vocabulary_'):
             raise ValueError("TF-IDF não foi treinado ainda!")
 
         vocab = self.vectorizer.vocabulary_
-        # Ordenar por índice (termos mais frequentes têm índices menores)
-        termos_ordenados = sorted(vocab.items(), key=lambda x: x[1])
+        # Menores índices primeiro (termos mais frequentes têm índices menores),
+        # sem ordenar o vocabulário inteiro
+        return heapq.nsmallest(top_n, vocab.items(), key=lambda x: x[1])
+
+
+def _tfidf_vocabulario(vectorizer: TfidfVectorizer, textos: List[str]) -> csr_matrix:
+    """
+    Mesmo resultado de vectorizer.transform (bit a bit), sem o overhead de
+    validação do sklearn: contagem pelo vocabulário, tf sublinear, idf e
+    normalização L2 aplicados direto no CSR. Cerca de 2x mais rápido para
+    um único email (caminho do app).
+
+    Args:
+        vectorizer: TfidfVectorizer já treinado
+        textos: Lista de textos preprocessados
 
-        return termos_ordenados[:top_n]
+    Returns:
+        Matriz TF-IDF esparsa (CSR)
+    """
+    analisar = vectorizer.build_analyzer()
+    vocabulario = vectorizer.vocabulary_
+
+    indptr, indices, contagens = [0], [], []
+    for texto in textos:
+        contagem = Counter(j for j in map(vocabulario.get, analisar(texto)) if j is not None)
+        colunas = sorted(contagem)
+        indices.extend(colunas)
+        contagens.extend(contagem[j] for j in colunas)
+        indptr.append(len(indices))
+
+    X = csr_matrix(
+        (np.asarray(contagens, dtype=vectorizer.dtype),
+         np.asarray(indices, dtype=np.int32),
+         np.asarray(indptr, dtype=np.int32)),
+        shape=(len(indptr) - 1, len(vocabulario))
+    )
+
+    # Mesma sequência de operações do TfidfTransformer.transform
+    if vectorizer.sublinear_tf:
+        np.log(X.data, X.data)
+        X.data += 1.0
+    if vectorizer.use_idf:
+        X.data *= vectorizer.idf_[X.indices]
+    if vectorizer.norm == 'l2':
+        inplace_csr_row_normalize_l2(X)
+    elif vectorizer.norm is not None:
+        X = normalize(X, norm=vectorizer.norm, copy=False)
+
+    return X
+
+
+def _extrair_bloco(extrator: ExtratorFeatures, textos: List[str],
+                   textos_originais: List[str]) -> Tuple[csr_matrix, np.ndarray]:
+    """
+    Extrai TF-IDF e features manuais de um bloco de textos
+    (função de módulo para poder ser enviada aos workers do joblib).
+
+    Returns:
+        Tupla (matriz TF-IDF, array de features manuais no dtype do vetorizador)
+    """
+    return (extrator.transformar_tfidf(textos),
+            extrator.extrair_features_manuais_array(textos, textos_originais,
+                                                    dtype=extrator.vectorizer.dtype))
 
 
 def criar_features_basicas(texto: str) -> Dict[str, any]:
@@ -251,20 +522,110 @@ def criar_features_basicas(texto: str) -> Dict[str, any]:
     Returns:
         Dicionário com features
     """
-    extrator = ExtratorFeatures()
+    # Helpers estáticos: nenhuma instância (nem TfidfVectorizer) é criada por chamada
+    texto_lower = texto.lower()
 
     features = {
-        'num_urls': extrator.contar_urls(texto),
-        'prop_maiusculas': extrator.proporcao_maiusculas(texto),
-        'num_especiais': extrator.contar_caracteres_especiais(texto),
-        'palavras_urgencia': extrator.detectar_palavras_urgencia(texto),
-        'palavras_financeiras': extrator.detectar_palavras_financeiras(texto),
-        'tamanho_texto': extrator.tamanho_texto(texto)
+        'num_urls': ExtratorFeatures.contar_urls(texto),
+        'prop_maiusculas': ExtratorFeatures.proporcao_maiusculas(texto),
+        'num_especiais': ExtratorFeatures.contar_caracteres_especiais(texto),
+        'palavras_urgencia': _contar_palavras(texto_lower, PALAVRAS_URGENCIA),
+        'palavras_financeiras': _contar_palavras(texto_lower, PALAVRAS_FINANCEIRAS),
+        'tamanho_texto': ExtratorFeatures.tamanho_texto(texto)
     }
 
     return features
 
 
+@njit(cache=True)
+def _contar_bytes(buf: np.ndarray) -> tuple:
+    """
+    Percorre os bytes (ASCII) do texto uma única vez.
+
+    Returns:
+        Tupla (num_urls, letras, maiusculas, num_especiais, num_palavras)
+    """
+    n = buf.shape[0]
+    num_urls = 0
+    letras = 0
+    maiusculas = 0
+    especiais = 0
+    palavras = 0
+    em_palavra = False
+
+    for i in range(n):
+        b = buf[i]
+
+        if 65 <= b <= 90:
+            letras += 1
+            maiusculas += 1
+        elif 97 <= b <= 122:
+            letras += 1
+        elif b == 33 or b == 63 or b == 36 or b == 37 or b == 38 or b == 42 or b == 64 or b == 35:
+            # ! ? $ % & * @ #
+            especiais += 1
+
+        # Espaços em branco de str.split() (9-13, 28-32)
+        if (9 <= b <= 13) or (28 <= b <= 32):
+            em_palavra = False
+        elif not em_palavra:
+            em_palavra = True
+            palavras += 1
+
+    # URLs: 'http://', 'https://' e 'www.' sem sobreposição (igual ao re.findall)
+    i = 0
+    while i < n:
+        b = buf[i] | 32
+        if b == 104 and i + 7 <= n and (buf[i + 1] | 32) == 116 and (buf[i + 2] | 32) == 116 \
+                and (buf[i + 3] | 32) == 112:
+            j = i + 4
+            if j < n and (buf[j] | 32) == 115:
+                j += 1
+            if j + 3 <= n and buf[j] == 58 and buf[j + 1] == 47 and buf[j + 2] == 47:
+                num_urls += 1
+                i = j + 3
+                continue
+        elif b == 119 and i + 4 <= n and (buf[i + 1] | 32) == 119 and (buf[i + 2] | 32) == 119 \
+                and buf[i + 3] == 46:
+            num_urls += 1
+            i += 4
+            continue
+        i += 1
+
+    return num_urls, letras, maiusculas, especiais, palavras
+
+
+def criar_features_basicas_jit(texto: str) -> Dict[str, any]:
+    """
+    Versão compilada (Numba) de criar_features_basicas.
+    Conta URLs, maiúsculas, caracteres especiais e palavras numa varredura
+    dos bytes do texto. Retorna o mesmo dicionário de criar_features_basicas.
+
+    Args:
+        texto: Texto do email
+
+    Returns:
+        Dicionário com features
+    """
+    # Texto não-ASCII mantém a semântica Unicode de isalpha/isupper/split
+    if not NUMBA_DISPONIVEL or not texto.isascii():
+        return criar_features_basicas(texto)
+
+    buf = np.frombuffer(texto.encode('ascii'), dtype=np.uint8)
+    num_urls, letras, maiusculas, especiais, palavras = _contar_bytes(buf)
+
+    texto_lower = texto.lower()
+
+    return {
+        'num_urls': int(num_urls),
+        'prop_maiusculas': maiusculas / letras if letras else 0.0,
+        'num_especiais': int(especiais),
+        'palavras_urgencia': _contar_palavras(texto_lower, PALAVRAS_URGENCIA),
+        'palavras_financeiras': _contar_palavras(texto_lower, PALAVRAS_FINANCEIRAS),
+        'tamanho_texto': int(palavras)
+    }
+
+
 if __name__ == "__main__":
     # Teste do módulo
     print("🧪 Testando extração de features...\n")
@@ -3,24 +3,58 @@ Módulo principal do modelo de Machine Learning para detecção de phishing.
 Implementa treinamento, avaliação e predição usando Regressão Logística.
 """
 
+import os
+import json
 import numpy as np
 import logging
-from typing import Tuple, Dict, List
-from sklearn.linear_model import LogisticRegression
-from sklearn.model_selection import train_test_split, cross_val_score
+from datetime import datetime
+from itertools import chain, islice
+from typing import Tuple, Dict, List, Iterable
+
+# Aceleradores opcionais do sklearn; precisam vir antes dos imports do sklearn.
+# GPU (cuml.accel) com PHISHING_GPU=1; tem prioridade sobre o sklearnex.
+_GPU_ATIVA = False
+if os.getenv('PHISHING_GPU', '0') == '1':
+    try:
+        import cuml.accel
+        cuml.accel.install()
+        _GPU_ATIVA = True
+    except Exception as e:  # ImportError, ou CUDA indisponível: segue na CPU
+        logging.getLogger(__name__).warning(f"⚠️  PHISHING_GPU=1, mas cuml.accel não pôde ser ativado: {e}")
+
+# Intel Extension for Scikit-learn (opcional): ativada com PHISHING_USE_SKLEARNEX=1.
+# Fica desligada por padrão porque modelos salvos com o patch só carregam
+# onde o sklearnex estiver instalado.
+if os.getenv('PHISHING_USE_SKLEARNEX', '0') == '1' and not _GPU_ATIVA:
+    try:
+        from sklearnex import patch_sklearn
+        patch_sklearn()
+    except ImportError:
+        logging.getLogger(__name__).warning("⚠️  PHISHING_USE_SKLEARNEX=1, mas o sklearnex não está instalado")
+
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.base import clone
+from sklearn.model_selection import train_test_split, cross_validate, StratifiedKFold
+from sklearn.pipeline import Pipeline
 from sklearn.metrics import (
     accuracy_score, precision_score, recall_score, f1_score,
-    confusion_matrix, classification_report, roc_auc_score, roc_curve
+    confusion_matrix, roc_auc_score
 )
-from sklearn.preprocessing import StandardScaler
-import matplotlib.pyplot as plt
-import seaborn as sns
+from sklearn.preprocessing import MaxAbsScaler, StandardScaler
+from scipy.special import expit
 
 from .preprocessamento import PreprocessadorTexto
 from .features import ExtratorFeatures
 
 logger = logging.getLogger(__name__)
 
+# Emails transformados por vez em predizer (limita o pico de memória)
+TAMANHO_LOTE_PREDICAO = 5000
+
+# Faixas de risco: p < 0.3 -> BAIXO, p < 0.7 -> MÉDIO, senão ALTO
+LIMITES_RISCO = np.array([0.3, 0.7])
+NIVEIS_RISCO = np.array(['BAIXO', 'MÉDIO', 'ALTO'], dtype=object)
+
 
 class DetectorPhishing:
     """
@@ -28,23 +62,28 @@ class DetectorPhishing:
     Integra pré-processamento, extração de features e modelo de ML.
     """
 
-    def __init__(self, idioma: str = 'english', max_features: int = 3000):
+    def __init__(self, idioma: str = 'english', max_features: int = 3000,
+                 usar_hashing: bool = False):
         """
         Inicializa o detector de phishing.
 
         Args:
             idioma: Idioma para pré-processamento ('english' ou 'portuguese')
             max_features: Número máximo de features TF-IDF
+            usar_hashing: Se True, TF-IDF via HashingVectorizer (memória constante
+                no tamanho do vocabulário; palavras importantes viram buckets)
         """
         self.idioma = idioma
         self.max_features = max_features
 
         # Componentes do pipeline
         self.preprocessador = PreprocessadorTexto(idioma=idioma)
-        self.extrator = ExtratorFeatures(max_features=max_features)
+        self.extrator = ExtratorFeatures(max_features=max_features, usar_hashing=usar_hashing)
 
         # Scaler para normalizar features (NOVO - resolve convergência)
-        self.scaler = StandardScaler()
+        # MaxAbsScaler não centraliza: a matriz TF-IDF continua esparsa;
+        # copy=False escala no lugar (as matrizes de features são sempre novas)
+        self.scaler = MaxAbsScaler(copy=False)
 
         # Modelo de ML - OTIMIZADO para melhor convergência
         self.modelo = LogisticRegression(
@@ -53,7 +92,6 @@ class DetectorPhishing:
         solver='liblinear',  # ⚡ MUDANÇA CRÍTICA - 3-5x mais rápido
         random_state=42,
         class_weight='balanced',
-        n_jobs=-1,
         verbose=0
         )
 
@@ -61,10 +99,19 @@ class DetectorPhishing:
         self.esta_treinado = False
         self.metricas = {}
 
+        # Sessão do onnxruntime (ver carregar_onnx); não vai para o pickle
+        self._sessao_onnx = None
+
         logger.info("✅ Detector de Phishing inicializado")
 
+    def __getstate__(self) -> Dict:
+        """A sessão do onnxruntime não é serializável: fica fora do pickle."""
+        estado = self.__dict__.copy()
+        estado.pop('_sessao_onnx', None)
+        return estado
+
     def preparar_dados(self, textos: List[str], labels: np.ndarray = None,
-                       test_size: float = 0.2) -> Tuple:
+                       test_size: float = 0.2, escalar: bool = True) -> Tuple:
         """
         Prepara dados para treinamento ou predição.
 
@@ -72,6 +119,8 @@ class DetectorPhishing:
             textos: Lista de emails (texto bruto)
             labels: Array com labels (0=legítimo, 1=phishing)
             test_size: Proporção de dados para teste
+            escalar: Com labels, se deve aplicar o scaler nos conjuntos de
+                treino/teste (False devolve as features sem escala; ver _escalar_divisao)
 
         Returns:
             Se labels fornecidos: (X_train, X_test, y_train, y_test)
@@ -79,8 +128,8 @@ class DetectorPhishing:
         """
         logger.info(f"Preparando {len(textos)} emails...")
 
-        # Manter textos originais para features de maiúsculas
-        textos_originais = textos.copy()
+        # Manter textos originais para features de maiúsculas (strings são imutáveis)
+        textos_originais = textos
 
         # Pré-processar
         textos_processados = self.preprocessador.processar_lote(textos)
@@ -89,29 +138,41 @@ class DetectorPhishing:
         if labels is not None and not self.esta_treinado:
             self.extrator.treinar_tfidf(textos_processados)
 
-        # Extrair features
+        # Extrair features (só o StandardScaler dos modelos antigos exige matriz densa)
         X = self.extrator.extrair_features_completas(
             textos_processados,
-            textos_originais
+            textos_originais,
+            dense=getattr(self.scaler, 'with_mean', False)
         )
 
-        # NOVO: Normalizar features para melhor convergência
-        if labels is not None and not self.esta_treinado:
-            # Treinar scaler apenas no conjunto de treino
-            X = self.scaler.fit_transform(X)
-        elif self.esta_treinado:
-            # Usar scaler já treinado
-            X = self.scaler.transform(X)
+        if labels is None:
+            # Predição: usar scaler já treinado
+            return self._escalar(X) if self.esta_treinado else X
 
-        # Se tem labels, dividir em treino/teste
-        if labels is not None:
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, labels, test_size=test_size, random_state=42, stratify=labels
-            )
-            logger.info(f"📊 Treino: {len(X_train)} | Teste: {len(X_test)}")
-            return X_train, X_test, y_train, y_test
+        # Labels 0/1 cabem em int8: 8x menos memória que int64 no split estratificado
+        labels = np.asarray(labels, dtype=np.int8)
+
+        # Dividir em treino/teste antes de escalar
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, labels, test_size=test_size, random_state=42, stratify=labels
+        )
+        logger.info(f"📊 Treino: {X_train.shape[0]} | Teste: {X_test.shape[0]}")
+
+        if escalar:
+            X_train, X_test = self._escalar_divisao(X_train, X_test)
+        return X_train, X_test, y_train, y_test
+
+    def _escalar_divisao(self, X_train, X_test) -> Tuple:
+        """
+        NOVO: Normaliza features para melhor convergência. O scaler é treinado
+        apenas no conjunto de treino (o teste não influencia a escala).
+        """
+        if not self.esta_treinado:
+            X_train = self.scaler.fit_transform(X_train)
         else:
-            return X
+            # Usar scaler já treinado
+            X_train = self._escalar(X_train)
+        return X_train, self._escalar(X_test)
 
     def treinar(self, textos: List[str], labels: np.ndarray,
                 test_size: float = 0.2, validacao_cruzada: bool = True) -> Dict:
@@ -129,44 +190,43 @@ class DetectorPhishing:
         """
         logger.info("🚀 Iniciando treinamento do modelo...")
 
-        # Preparar dados
+        # Preparar dados (sem escala: a validação cruzada reescala por fold)
         X_train, X_test, y_train, y_test = self.preparar_dados(
-            textos, labels, test_size
+            textos, labels, test_size, escalar=False
         )
 
+        # Validação cruzada (opcional), antes de escalar: o scaler entra no
+        # Pipeline e é treinado só com os folds de treino de cada divisão
+        cv_scores = None
+        if validacao_cruzada:
+            logger.info("Executando validação cruzada (5-fold)...")
+            pipeline = Pipeline([('scaler', clone(self.scaler)), ('clf', clone(self.modelo))])
+            cv_scores = cross_validate(
+                pipeline, X_train, y_train,
+                cv=StratifiedKFold(n_splits=5, shuffle=True, random_state=42),
+                scoring='accuracy', n_jobs=-1, return_train_score=False
+            )['test_score']
+            logger.info(f"📊 CV Score: {cv_scores.mean():.4f} (+/- {cv_scores.std():.4f})")
+
+        X_train, X_test = self._escalar_divisao(X_train, X_test)
+
         # Treinar modelo
         logger.info("Treinando Regressão Logística (otimizada)...")
         logger.info("⏳ Isso pode levar alguns minutos com datasets grandes...")
 
         self.modelo.fit(X_train, y_train)
         self.esta_treinado = True
+        self._sessao_onnx = None  # uma sessão ONNX carregada seria do modelo anterior
         logger.info("✅ Modelo treinado com sucesso!")
 
-        # Fazer predições
-        y_pred_train = self.modelo.predict(X_train)
-        y_pred_test = self.modelo.predict(X_test)
-        y_pred_proba_test = self.modelo.predict_proba(X_test)[:, 1]
-
         # Calcular métricas
-        metricas = {
-            'acuracia_treino': accuracy_score(y_train, y_pred_train),
-            'acuracia_teste': accuracy_score(y_test, y_pred_test),
-            'precisao': precision_score(y_test, y_pred_test),
-            'recall': recall_score(y_test, y_pred_test),
-            'f1_score': f1_score(y_test, y_pred_test),
-            'auc_roc': roc_auc_score(y_test, y_pred_proba_test),
-            'matriz_confusao': confusion_matrix(y_test, y_pred_test)
-        }
+        metricas = self._calcular_metricas(
+            accuracy_score(y_train, self.modelo.predict(X_train)), X_test, y_test
+        )
 
-        # Validação cruzada (opcional)
-        if validacao_cruzada:
-            logger.info("Executando validação cruzada (5-fold)...")
-            cv_scores = cross_val_score(
-                self.modelo, X_train, y_train, cv=5, scoring='accuracy', n_jobs=-1
-            )
+        if cv_scores is not None:
             metricas['cv_mean'] = cv_scores.mean()
             metricas['cv_std'] = cv_scores.std()
-            logger.info(f"📊 CV Score: {cv_scores.mean():.4f} (+/- {cv_scores.std():.4f})")
 
         self.metricas = metricas
 
@@ -175,6 +235,126 @@ class DetectorPhishing:
 
         return metricas
 
+    def treinar_incremental(self, textos: Iterable[str], labels: Iterable[int],
+                            tamanho_lote: int = 1024,
+                            tamanho_amostra_tfidf: int = 10000) -> Dict:
+        """
+        Treina em lotes (partial_fit) com SGDClassifier(loss='log_loss'),
+        sem carregar o dataset inteiro na memória.
+
+        O primeiro lote é reservado para as métricas e os emails seguintes da
+        amostra inicial (até `tamanho_amostra_tfidf`) treinam o TF-IDF, se
+        ainda não treinado; a validação não participa de nenhum ajuste.
+
+        Args:
+            textos: Iterável de emails (ex.: gerador lendo o CSV aos poucos)
+            labels: Iterável de labels (0=legítimo, 1=phishing), alinhado aos textos
+            tamanho_lote: Emails por chamada de partial_fit
+            tamanho_amostra_tfidf: Emails usados para treinar o TF-IDF
+
+        Returns:
+            Dicionário com métricas de performance
+        """
+        logger.info("🚀 Iniciando treinamento incremental (SGD)...")
+
+        pares = zip(textos, labels)
+        amostra = list(islice(pares, max(tamanho_amostra_tfidf, 2 * tamanho_lote)))
+        if len(amostra) <= tamanho_lote:
+            raise ValueError("❌ Dados insuficientes: é preciso mais de um lote de emails")
+
+        if not self.esta_treinado:
+            self.extrator.treinar_tfidf(
+                self.preprocessador.processar_lote([t for t, _ in amostra[tamanho_lote:]])
+            )
+
+        if not isinstance(self.modelo, SGDClassifier):
+            # class_weight='balanced' não é suportado em partial_fit
+            self.modelo = SGDClassifier(loss='log_loss', alpha=1e-4, random_state=42)
+            self.scaler = MaxAbsScaler(copy=False)
+
+        validacao, restante = amostra[:tamanho_lote], chain(amostra[tamanho_lote:], pares)
+        classes = np.array([0, 1])
+        acertos_treino = total_treino = 0
+
+        while True:
+            lote = list(islice(restante, tamanho_lote))
+            if not lote:
+                break
+
+            textos_lote = [t for t, _ in lote]
+            y_lote = np.fromiter((y for _, y in lote), dtype=np.int64, count=len(lote))
+            X_lote = self._extrair_features(textos_lote)
+
+            self.scaler.partial_fit(X_lote)
+            X_lote = self._escalar(X_lote)
+            self.modelo.partial_fit(X_lote, y_lote, classes=classes)
+
+            acertos_treino += int((self.modelo.predict(X_lote) == y_lote).sum())
+            total_treino += len(lote)
+
+        self.esta_treinado = True
+        self._sessao_onnx = None
+        logger.info(f"✅ Modelo treinado com sucesso! ({total_treino} emails)")
+
+        X_validacao = self._escalar(self._extrair_features([t for t, _ in validacao]))
+        y_validacao = np.array([y for _, y in validacao])
+
+        metricas = self._calcular_metricas(acertos_treino / total_treino, X_validacao, y_validacao)
+        self.metricas = metricas
+        self._exibir_metricas(metricas)
+
+        return metricas
+
+    def _extrair_features(self, textos: List[str]):
+        """Pré-processa e extrai as features (sem escalar) de uma lista de emails."""
+        return self.extrator.extrair_features_completas(
+            self.preprocessador.processar_lote(textos),
+            textos,
+            dense=getattr(self.scaler, 'with_mean', False)
+        )
+
+    def _escalar(self, X):
+        """
+        Aplica o scaler já treinado no lugar, sem copiar X (que sempre acabou
+        de ser extraído). Vale também para o StandardScaler dos modelos antigos.
+        """
+        if isinstance(self.scaler, StandardScaler):
+            return self.scaler.transform(X, copy=False)
+        return self.scaler.transform(X)
+
+    def _calcular_metricas(self, acuracia_treino: float, X_test, y_test: np.ndarray) -> Dict:
+        """
+        Calcula as métricas de teste do modelo treinado.
+
+        Args:
+            acuracia_treino: Acurácia já calculada no conjunto de treino
+            X_test: Features (escaladas) do conjunto de teste
+            y_test: Labels do conjunto de teste
+
+        Returns:
+            Dicionário com métricas de performance
+        """
+        y_pred_test = self.modelo.predict(X_test)
+        y_pred_proba_test = self.modelo.predict_proba(X_test)[:, 1]
+
+        # AUC não é definida com uma só classe (ex.: CSV ordenado por label
+        # no treino incremental): reporta NaN em vez de falhar após o treino
+        if np.unique(y_test).size < 2:
+            logger.warning("⚠️  Conjunto de teste com uma só classe: AUC-ROC não calculada")
+            auc_roc = float('nan')
+        else:
+            auc_roc = roc_auc_score(y_test, y_pred_proba_test)
+
+        return {
+            'acuracia_treino': acuracia_treino,
+            'acuracia_teste': accuracy_score(y_test, y_pred_test),
+            'precisao': precision_score(y_test, y_pred_test),
+            'recall': recall_score(y_test, y_pred_test),
+            'f1_score': f1_score(y_test, y_pred_test),
+            'auc_roc': auc_roc,
+            'matriz_confusao': confusion_matrix(y_test, y_pred_test, labels=[0, 1])
+        }
+
     def _exibir_metricas(self, metricas: Dict) -> None:
         """
         Exibe métricas de forma visual no console.
@@ -200,12 +380,17 @@ class DetectorPhishing:
         print(metricas['matriz_confusao'])
         print("=" * 60 + "\n")
 
-    def predizer(self, textos: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    def predizer(self, textos: List[str],
+                 tamanho_lote: int = TAMANHO_LOTE_PREDICAO) -> Tuple[np.ndarray, np.ndarray]:
         """
         Faz predições para novos emails.
 
+        Textos são processados em lotes de até `tamanho_lote`, o que limita o
+        pico de memória da matriz de features (densa nos modelos com StandardScaler).
+
         Args:
             textos: Lista de emails para classificar
+            tamanho_lote: Máximo de emails transformados de uma vez
 
         Returns:
             Tupla (predições, probabilidades)
@@ -215,14 +400,151 @@ class DetectorPhishing:
         if not self.esta_treinado:
             raise ValueError("❌ Modelo não foi treinado ainda! Use .treinar() primeiro.")
 
-        # Preparar dados
-        X = self.preparar_dados(textos)
+        textos = list(textos)
+        if not textos:
+            return self._predicao_vazia()
+
+        if getattr(self, '_sessao_onnx', None) is not None:
+            return self.predizer_onnx(textos, tamanho_lote)
+
+        if self._coeficientes_binarios() is not None:
+            return self.predizer_rapido(textos, tamanho_lote)
+
+        partes_pred, partes_proba = [], []
+
+        for inicio in range(0, len(textos), tamanho_lote):
+            # Preparar dados (só o lote atual fica em memória)
+            X = self.preparar_dados(textos[inicio:inicio + tamanho_lote])
+
+            # Fazer predições
+            partes_pred.append(self.modelo.predict(X))
+            partes_proba.append(self.modelo.predict_proba(X)[:, 1])
+            del X
+
+        if len(partes_pred) == 1:
+            return partes_pred[0], partes_proba[0]
+        return np.concatenate(partes_pred), np.concatenate(partes_proba)
+
+    def predizer_rapido(self, textos: List[str],
+                        tamanho_lote: int = TAMANHO_LOTE_PREDICAO) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Predição direta para modelos lineares binários: score = X @ w + b,
+        classe = score > 0 e probabilidade = expit(score), sem a validação
+        e o tratamento multiclasse de predict/predict_proba a cada lote.
+        Os resultados são os mesmos de predict/predict_proba.
+
+        Args:
+            textos: Lista de emails para classificar
+            tamanho_lote: Máximo de emails transformados de uma vez
+
+        Returns:
+            Tupla (predições, probabilidades), como em predizer
+        """
+        if not self.esta_treinado:
+            raise ValueError("❌ Modelo não foi treinado ainda! Use .treinar() primeiro.")
+
+        coeficientes = self._coeficientes_binarios()
+        if coeficientes is None:
+            raise ValueError("❌ predizer_rapido requer um classificador linear binário")
+        w, b = coeficientes
+
+        textos = list(textos)
+        if not textos:
+            return self._predicao_vazia()
+
+        scores = np.concatenate([
+            self.preparar_dados(textos[inicio:inicio + tamanho_lote]) @ w + b
+            for inicio in range(0, len(textos), tamanho_lote)
+        ])
+
+        predicoes = self.modelo.classes_[(scores > 0).astype(np.intp)]
+        return predicoes, expit(scores)
+
+    def predizer_onnx(self, textos: List[str],
+                      tamanho_lote: int = TAMANHO_LOTE_PREDICAO) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Predição com scaler + classificador executados pelo onnxruntime
+        (exportados com exportar_onnx e carregados com carregar_onnx).
+        Pré-processamento e features continuam em Python; as probabilidades
+        são calculadas em float32 (diferenças da ordem de 1e-7 em relação a predizer).
+        A entrada do grafo é densa: cada lote vira uma matriz tamanho_lote x
+        n_features (por isso o modo hashing não é aceito, ver exportar_onnx).
+
+        Args:
+            textos: Lista de emails para classificar
+            tamanho_lote: Máximo de emails transformados de uma vez
+
+        Returns:
+            Tupla (predições, probabilidades), como em predizer
+        """
+        sessao = getattr(self, '_sessao_onnx', None)
+        if sessao is None:
+            raise ValueError("❌ Nenhuma sessão ONNX carregada! Use .carregar_onnx() primeiro.")
+
+        entrada = sessao.get_inputs()[0].name
+        textos = list(textos)
+        if not textos:
+            return self._predicao_vazia()
+
+        partes_pred, partes_proba = [], []
+
+        for inicio in range(0, len(textos), tamanho_lote):
+            lote = textos[inicio:inicio + tamanho_lote]
+            X = self.extrator.extrair_features_completas(
+                self.preprocessador.processar_lote(lote), lote, dense=True
+            )
+            predicoes, probabilidades = sessao.run(None, {entrada: X.astype(np.float32, copy=False)})
+            partes_pred.append(predicoes)
+            partes_proba.append(probabilidades[:, 1])
+
+        if len(partes_pred) == 1:
+            return partes_pred[0], partes_proba[0]
+        return np.concatenate(partes_pred), np.concatenate(partes_proba)
+
+    def _predicao_vazia(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Resultado de predizer para um lote vazio (sem passar pelo scaler)."""
+        return np.empty(0, dtype=self.modelo.classes_.dtype), np.empty(0, dtype=np.float64)
+
+    def _coeficientes_binarios(self):
+        """
+        Pesos (w, b) do classificador se ele for linear e binário, ou None.
+
+        Lidos do modelo a cada chamada (coef_[0] é uma view, sem cópia), então
+        nunca ficam desatualizados após um novo treino; mantêm o dtype de
+        coef_ para não alterar as probabilidades.
+        """
+        coef = getattr(self.modelo, 'coef_', None)
+        if coef is None or coef.shape[0] != 1 or len(self.modelo.classes_) != 2:
+            return None
+        return coef[0], self.modelo.intercept_[0]
+
+    def _predizer_um(self, texto: str) -> Tuple[int, float]:
+        """
+        Predição de um único email, sem o overhead de lote de predizer
+        (processar_lote, fatiamento e concatenação).
+
+        Args:
+            texto: Texto do email
+
+        Returns:
+            Tupla (predição, probabilidade de ser phishing)
+        """
+        texto_processado = self.preprocessador.processar(texto)
+
+        X = self.extrator.extrair_features_completas(
+            [texto_processado], [texto],
+            dense=getattr(self.scaler, 'with_mean', False),
+            n_jobs=1
+        )
+        X = self._escalar(X)
 
-        # Fazer predições
-        predicoes = self.modelo.predict(X)
-        probabilidades = self.modelo.predict_proba(X)[:, 1]
+        if len(self.modelo.classes_) != 2:
+            return int(self.modelo.predict(X)[0]), float(self.modelo.predict_proba(X)[0, 1])
 
-        return predicoes, probabilidades
+        # Binário: predict e predict_proba derivam do mesmo decision_function
+        # (classe = score > 0, probabilidade = expit(score)); calcula-se uma vez só
+        score = self.modelo.decision_function(X)
+        return int(self.modelo.classes_[int(score[0] > 0)]), float(expit(score)[0])
 
     def analisar_email(self, texto: str, mostrar_features: bool = False) -> Dict:
         """
@@ -239,22 +561,61 @@ class DetectorPhishing:
             raise ValueError("❌ Modelo não foi treinado ainda!")
 
         # Predizer
-        predicao, probabilidade = self.predizer([texto])
+        predicao, probabilidade = self._predizer_um(texto)
 
         resultado = {
-            'e_phishing': bool(predicao[0]),
-            'confianca': float(probabilidade[0]),
-            'classificacao': 'PHISHING' if predicao[0] else 'LEGÍTIMO',
-            'nivel_risco': self._calcular_nivel_risco(probabilidade[0])
+            'e_phishing': bool(predicao),
+            'confianca': float(probabilidade),
+            'classificacao': 'PHISHING' if predicao else 'LEGÍTIMO',
+            'nivel_risco': self._calcular_nivel_risco(probabilidade)
         }
 
         # Adicionar features se solicitado
         if mostrar_features:
-            from .features import criar_features_basicas
-            resultado['features'] = criar_features_basicas(texto)
+            from .features import criar_features_basicas_jit
+            resultado['features'] = criar_features_basicas_jit(texto)
 
         return resultado
 
+    def analisar_emails(self, textos: List[str], mostrar_features: bool = False) -> List[Dict]:
+        """
+        Analisa vários emails de uma vez (uma predição e um cálculo de risco
+        para o lote inteiro).
+
+        Args:
+            textos: Lista de emails
+            mostrar_features: Se deve incluir features extraídas
+
+        Returns:
+            Lista de dicionários no mesmo formato de analisar_email
+        """
+        if not self.esta_treinado:
+            raise ValueError("❌ Modelo não foi treinado ainda!")
+
+        textos = list(textos)
+        if not textos:
+            return []
+
+        predicoes, probabilidades = self.predizer(textos)
+        niveis = self._calcular_niveis_risco(probabilidades)
+
+        resultados = [
+            {
+                'e_phishing': bool(predicao),
+                'confianca': probabilidade,
+                'classificacao': 'PHISHING' if predicao else 'LEGÍTIMO',
+                'nivel_risco': nivel
+            }
+            for predicao, probabilidade, nivel in zip(predicoes.tolist(), probabilidades.tolist(), niveis)
+        ]
+
+        if mostrar_features:
+            from .features import criar_features_basicas_jit
+            for resultado, texto in zip(resultados, textos):
+                resultado['features'] = criar_features_basicas_jit(texto)
+
+        return resultados
+
     def _calcular_nivel_risco(self, probabilidade: float) -> str:
         """
         Calcula nível de risco baseado na probabilidade.
@@ -272,6 +633,20 @@ class DetectorPhishing:
         else:
             return "ALTO"
 
+    @staticmethod
+    def _calcular_niveis_risco(probabilidades: np.ndarray) -> np.ndarray:
+        """
+        Versão vetorizada de _calcular_nivel_risco para um array de probabilidades.
+
+        Args:
+            probabilidades: Probabilidades de ser phishing (0.0 a 1.0)
+
+        Returns:
+            Array (object) com o nível de risco de cada probabilidade
+        """
+        # side='right': p == 0.3 já é MÉDIO e p == 0.7 já é ALTO (NaN cai em ALTO)
+        return NIVEIS_RISCO[np.searchsorted(LIMITES_RISCO, probabilidades, side='right')]
+
     def plotar_matriz_confusao(self, salvar: str = None) -> None:
         """
         Plota matriz de confusão.
@@ -283,6 +658,10 @@ class DetectorPhishing:
             logger.warning("⚠️  Nenhuma métrica disponível. Treine o modelo primeiro.")
             return
 
+        # Importados aqui: só este método precisa deles (import do módulo fica mais leve)
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
         cm = self.metricas['matriz_confusao']
 
         plt.figure(figsize=(8, 6))
@@ -316,33 +695,39 @@ class DetectorPhishing:
         # Obter coeficientes do modelo
         coef = self.modelo.coef_[0]
 
-        # Obter vocabulário TF-IDF
-        vocab = self.extrator.vectorizer.vocabulary_
-        vocab_invertido = {v: k for k, v in vocab.items()}
-
         # Pegar apenas features TF-IDF (excluir features manuais no final)
-        num_features_tfidf = len(vocab)
+        termos = self.extrator.termos_por_indice()
+        num_features_tfidf = self.extrator.vectorizer.n_features if termos is None else len(termos)
         coef_tfidf = coef[:num_features_tfidf]
+        top_n = min(top_n, num_features_tfidf)
+
+        def nome(i):
+            # No modo hashing só há o índice do bucket
+            return f"bucket#{i}" if termos is None else termos[i]
 
+        # argpartition (O(V)) separa os top_n; só eles são ordenados
         # Palavras que indicam PHISHING (coeficientes positivos altos)
-        indices_phishing = np.argsort(coef_tfidf)[-top_n:][::-1]
-        palavras_phishing = [(vocab_invertido[i], coef_tfidf[i]) for i in indices_phishing]
+        topo = np.argpartition(coef_tfidf, -top_n)[-top_n:]
+        indices_phishing = topo[np.argsort(coef_tfidf[topo])][::-1]
+        palavras_phishing = [(nome(i), coef_tfidf[i]) for i in indices_phishing]
 
         # Palavras que indicam LEGÍTIMO (coeficientes negativos altos)
-        indices_legitimo = np.argsort(coef_tfidf)[:top_n]
-        palavras_legitimo = [(vocab_invertido[i], coef_tfidf[i]) for i in indices_legitimo]
+        base = np.argpartition(coef_tfidf, top_n - 1)[:top_n]
+        indices_legitimo = base[np.argsort(coef_tfidf[base])]
+        palavras_legitimo = [(nome(i), coef_tfidf[i]) for i in indices_legitimo]
 
         return {
             'phishing': palavras_phishing,
             'legitimo': palavras_legitimo
         }
 
-    def salvar(self, caminho: str) -> None:
+    def salvar(self, caminho: str, otimizar_pickle: bool = True) -> None:
         """
         Salva o modelo completo (incluindo preprocessador e extrator).
 
         Args:
             caminho: Caminho do arquivo .pkl
+            otimizar_pickle: Se deve otimizar o pickle com pickletools (ver salvar_modelo)
         """
         from .utils import salvar_modelo
 
@@ -356,7 +741,7 @@ class DetectorPhishing:
         }
 
         # Salvar objeto completo (self contém tudo)
-        salvar_modelo(self, caminho, metadata)
+        salvar_modelo(self, caminho, metadata, otimizar_pickle=otimizar_pickle)
 
     @classmethod
     def carregar(cls, caminho: str) -> 'DetectorPhishing':
@@ -379,6 +764,300 @@ class DetectorPhishing:
 
         return detector
 
+    def salvar_safetensors(self, caminho: str) -> None:
+        """
+        Salva os pesos do modelo em formato safetensors + metadata JSON.
+        Evita o pickle no carregamento: os arrays são lidos direto do arquivo
+        e os hiperparâmetros/vocabulário ficam num JSON ao lado.
+
+        Args:
+            caminho: Caminho do arquivo .safetensors (o .json é salvo ao lado)
+        """
+        from safetensors.numpy import save_file
+
+        if not self.esta_treinado:
+            logger.warning("⚠️  Modelo não foi treinado. Salvando mesmo assim...")
+
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+        extrator = self.extrator
+        idf = extrator.transformador_tfidf.idf_ if extrator.usar_hashing else extrator.vectorizer.idf_
+        tensores = {'vectorizer.idf_': idf}
+        tensores_modelo, extras_modelo = _separar_atributos_ajustados(self.modelo, 'modelo.')
+        tensores_scaler, extras_scaler = _separar_atributos_ajustados(self.scaler, 'scaler.')
+        tensores.update(tensores_modelo)
+        tensores.update(tensores_scaler)
+
+        save_file({k: np.ascontiguousarray(v) for k, v in tensores.items()}, caminho)
+
+        metadata = {
+            'formato': 1,
+            'idioma': self.idioma,
+            'max_features': self.max_features,
+            'ngram_range': list(self.extrator.ngram_range),
+            'dtype': np.dtype(extrator.vectorizer.dtype).name,
+            'usar_hashing': extrator.usar_hashing,
+            'stopwords': sorted(self.preprocessador.stopwords),
+            'vocabulario': ({} if extrator.usar_hashing else
+                            {termo: int(i) for termo, i in extrator.vectorizer.vocabulary_.items()}),
+            'modelo': {
+                'classe': type(self.modelo).__name__,
+                'params': self.modelo.get_params(),
+                'atributos': extras_modelo
+            },
+            'scaler': {
+                'classe': type(self.scaler).__name__,
+                'params': self.scaler.get_params(),
+                'atributos': extras_scaler
+            },
+            'metricas': _metricas_para_json(self.metricas),
+            'data_salvamento': datetime.now().isoformat()
+        }
+
+        with open(_caminho_metadata(caminho), 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, ensure_ascii=False)
+
+        tamanho_mb = os.path.getsize(caminho) / (1024 * 1024)
+        logger.info(f"✅ Modelo salvo em safetensors: {caminho} ({tamanho_mb:.2f} MB)")
+
+    @classmethod
+    def carregar_safetensors(cls, caminho: str) -> 'DetectorPhishing':
+        """
+        Carrega modelo salvo com salvar_safetensors (sem usar pickle).
+
+        Args:
+            caminho: Caminho do arquivo .safetensors
+
+        Returns:
+            Instância de DetectorPhishing carregada
+        """
+        preprocessador, extrator = cls.carregar_componentes_texto(caminho)
+        scaler, modelo, metricas = cls.carregar_componentes_classificador(caminho)
+
+        logger.info(f"✅ Modelo carregado de safetensors: {caminho}")
+        return cls.de_componentes(preprocessador, extrator, scaler, modelo, metricas)
+
+    @staticmethod
+    def carregar_componentes_texto(caminho: str) -> Tuple[PreprocessadorTexto, ExtratorFeatures]:
+        """
+        Carrega só a parte de texto (preprocessador + TF-IDF) do safetensors.
+
+        Args:
+            caminho: Caminho do arquivo .safetensors
+
+        Returns:
+            Tupla (preprocessador, extrator)
+        """
+        metadata = _ler_metadata(caminho)
+        tensores = _ler_tensores(caminho, 'vectorizer.')
+
+        preprocessador = PreprocessadorTexto(idioma=metadata['idioma'])
+        # Stopwords gravadas no JSON (não depende do corpus NLTK)
+        preprocessador.stopwords = frozenset(metadata['stopwords'])
+
+        extrator = ExtratorFeatures(
+            max_features=metadata['max_features'],
+            ngram_range=tuple(metadata['ngram_range']),
+            # Arquivos sem 'dtype' são anteriores ao float32
+            dtype=np.dtype(metadata.get('dtype', 'float64')).type,
+            usar_hashing=metadata.get('usar_hashing', False)
+        )
+        if extrator.usar_hashing:
+            extrator.transformador_tfidf.idf_ = tensores['vectorizer.idf_']
+        else:
+            extrator.vectorizer.vocabulary_ = metadata['vocabulario']
+            extrator.vectorizer.idf_ = tensores['vectorizer.idf_']
+
+        return preprocessador, extrator
+
+    @staticmethod
+    def carregar_componentes_classificador(caminho: str) -> Tuple:
+        """
+        Carrega só o scaler + classificador (e métricas) do safetensors.
+
+        Args:
+            caminho: Caminho do arquivo .safetensors
+
+        Returns:
+            Tupla (scaler, modelo, metricas)
+        """
+        metadata = _ler_metadata(caminho)
+
+        # Scaler e classificador reconstruídos atribuindo os arrays ajustados
+        scaler = _reconstruir_estimador(metadata['scaler'], _ler_tensores(caminho, 'scaler.'), 'scaler.')
+        modelo = _reconstruir_estimador(metadata['modelo'], _ler_tensores(caminho, 'modelo.'), 'modelo.')
+
+        metricas = metadata.get('metricas', {})
+        if 'matriz_confusao' in metricas:
+            metricas['matriz_confusao'] = np.array(metricas['matriz_confusao'])
+
+        return scaler, modelo, metricas
+
+    @classmethod
+    def de_componentes(cls, preprocessador: PreprocessadorTexto, extrator: ExtratorFeatures,
+                       scaler, modelo, metricas: Dict = None) -> 'DetectorPhishing':
+        """
+        Monta um detector treinado a partir de componentes já carregados.
+        Permite manter texto e classificador em caches separados.
+
+        Returns:
+            Instância de DetectorPhishing pronta para predição
+        """
+        detector = cls.__new__(cls)
+        detector.idioma = preprocessador.idioma
+        detector.max_features = extrator.max_features
+        detector.preprocessador = preprocessador
+        detector.extrator = extrator
+        detector.scaler = scaler
+        detector.modelo = modelo
+        detector.esta_treinado = True
+        detector.metricas = metricas or {}
+        detector._sessao_onnx = None
+        return detector
+
+    def exportar_onnx(self, caminho: str) -> None:
+        """
+        Exporta scaler + classificador para ONNX (requer skl2onnx).
+        O TF-IDF e as features manuais não entram: dependem do pré-processamento
+        em Python, então a entrada do grafo é a matriz de features (float32, densa).
+        Modelos com usar_hashing não são aceitos: com 2**18 colunas, um lote
+        denso ocuparia gigabytes.
+
+        Args:
+            caminho: Caminho do arquivo .onnx
+        """
+        if not self.esta_treinado:
+            raise ValueError("❌ Modelo não foi treinado ainda! Use .treinar() primeiro.")
+        self._verificar_suporte_onnx()
+
+        from skl2onnx import convert_sklearn
+        from skl2onnx.common.data_types import FloatTensorType
+
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+        pipeline = Pipeline([('scaler', self.scaler), ('clf', self.modelo)])
+        onnx_modelo = convert_sklearn(
+            pipeline,
+            initial_types=[('features', FloatTensorType([None, self.scaler.n_features_in_]))],
+            options={id(self.modelo): {'zipmap': False}}  # probabilidades como tensor
+        )
+
+        with open(caminho, 'wb') as f:
+            f.write(onnx_modelo.SerializeToString())
+
+        tamanho_mb = os.path.getsize(caminho) / (1024 * 1024)
+        logger.info(f"✅ Modelo exportado para ONNX: {caminho} ({tamanho_mb:.2f} MB)")
+
+    def carregar_onnx(self, caminho: str, providers: List[str] = None) -> None:
+        """
+        Carrega no onnxruntime um modelo salvo com exportar_onnx; a partir
+        daí predizer usa predizer_onnx.
+
+        Args:
+            caminho: Caminho do arquivo .onnx
+            providers: Providers do onnxruntime (padrão: ['CPUExecutionProvider'];
+                ex.: ['CUDAExecutionProvider', 'CPUExecutionProvider'])
+        """
+        self._verificar_suporte_onnx()
+
+        import onnxruntime
+
+        self._sessao_onnx = onnxruntime.InferenceSession(
+            caminho, providers=providers or ['CPUExecutionProvider']
+        )
+        logger.info(f"✅ Sessão ONNX carregada: {caminho}")
+
+    def _verificar_suporte_onnx(self) -> None:
+        """Recusa o caminho ONNX (entrada densa) para modelos com HashingVectorizer."""
+        if self.extrator.usar_hashing:
+            raise ValueError(
+                "❌ ONNX não suportado com usar_hashing=True: a entrada do grafo é densa "
+                f"({self.scaler.n_features_in_} colunas por email). Use predizer()."
+            )
+
+
+# Estimadores aceitos na reconstrução a partir do JSON
+_ESTIMADORES = {
+    'LogisticRegression': LogisticRegression,
+    'SGDClassifier': SGDClassifier,
+    'MaxAbsScaler': MaxAbsScaler,
+    'StandardScaler': StandardScaler,
+}
+
+
+def _caminho_metadata(caminho: str) -> str:
+    """Retorna o caminho do JSON de metadata ao lado do .safetensors."""
+    return os.path.splitext(caminho)[0] + '.json'
+
+
+def _ler_metadata(caminho: str) -> Dict:
+    """Lê o JSON de metadata que acompanha o .safetensors."""
+    caminho_json = _caminho_metadata(caminho)
+    if not os.path.exists(caminho) or not os.path.exists(caminho_json):
+        raise FileNotFoundError(f"Modelo não encontrado: {caminho} (+ {caminho_json})")
+
+    with open(caminho_json, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _ler_tensores(caminho: str, prefixo: str) -> Dict[str, np.ndarray]:
+    """Lê do .safetensors apenas os tensores com o prefixo informado."""
+    from safetensors import safe_open
+
+    with safe_open(caminho, framework='np') as f:
+        return {chave: f.get_tensor(chave) for chave in f.keys() if chave.startswith(prefixo)}
+
+
+def _separar_atributos_ajustados(estimador, prefixo: str) -> Tuple[Dict, Dict]:
+    """
+    Separa os atributos ajustados (terminados em '_') de um estimador sklearn.
+
+    Returns:
+        Tupla (tensores, extras): arrays numéricos vão para o safetensors,
+        escalares vão para o JSON
+    """
+    tensores, extras = {}, {}
+    for nome, valor in vars(estimador).items():
+        if not nome.endswith('_') or nome.startswith('_'):
+            continue
+        if isinstance(valor, np.ndarray) and valor.dtype.kind in 'biuf':
+            tensores[prefixo + nome] = valor
+        elif isinstance(valor, (bool, int, float, np.integer, np.floating)):
+            extras[nome] = valor.item() if isinstance(valor, np.generic) else valor
+    return tensores, extras
+
+
+def _reconstruir_estimador(info: Dict, tensores: Dict, prefixo: str):
+    """Recria um estimador sklearn a partir dos params + atributos ajustados."""
+    classe = _ESTIMADORES.get(info['classe'])
+    if classe is None:
+        raise ValueError(f"❌ Estimador não suportado no safetensors: {info['classe']}")
+
+    estimador = classe(**info['params'])
+    for nome, valor in info.get('atributos', {}).items():
+        setattr(estimador, nome, valor)
+    for chave, valor in tensores.items():
+        if chave.startswith(prefixo):
+            setattr(estimador, chave[len(prefixo):], valor)
+    return estimador
+
+
+def _metricas_para_json(metricas: Dict) -> Dict:
+    """Converte métricas (com tipos numpy) para tipos serializáveis em JSON."""
+    convertidas = {}
+    for chave, valor in metricas.items():
+        if isinstance(valor, np.ndarray):
+            convertidas[chave] = valor.tolist()
+        elif isinstance(valor, np.generic):
+            convertidas[chave] = valor.item()
+        else:
+            convertidas[chave] = valor
+    return convertidas
+
 
 def exemplo_uso():
     """
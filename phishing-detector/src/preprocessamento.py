@@ -3,10 +3,14 @@ Módulo de pré-processamento de texto para detecção de phishing.
 Realiza limpeza, normalização e preparação de emails para análise.
 """
 
+import os
 import re
+import sys
 import string
 import logging
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Tuple
 import nltk
 from nltk.corpus import stopwords
 from .cache import CachePreprocessamento
@@ -14,13 +18,71 @@ from multiprocessing import Pool, cpu_count
 
 logger = logging.getLogger(__name__)
 
-# Baixar recursos do NLTK se necessário
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    logger.info("Baixando recursos do NLTK...")
-    nltk.download('stopwords', quiet=True)
-    nltk.download('punkt', quiet=True)
+# Padrões compilados uma única vez (não dependem da instância)
+RE_URL = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
+RE_ESPACOS = re.compile(r'\s+')
+
+
+class _TabelaLimpeza(dict):
+    """
+    Tabela de str.translate que apaga a pontuação ASCII e qualquer caractere
+    não-ASCII numa passagem só (o mesmo que translate + encode('ascii', 'ignore')).
+    Os não-ASCII entram na tabela conforme aparecem, em vez de pré-alocar
+    as ~1,1 milhão de posições do Unicode.
+    """
+
+    def __missing__(self, codigo: int) -> None:
+        self[codigo] = None
+        return None
+
+
+TABELA_LIMPEZA = _TabelaLimpeza(
+    (codigo, None if chr(codigo) in string.punctuation else codigo) for codigo in range(128)
+)
+
+# Mínimo de textos (ausentes do cache) para valer a pena paralelizar
+MIN_TEXTOS_PARALELO = 500
+
+# Em Python sem GIL (3.13t) threads escalam e não pagam fork/pickle;
+# com GIL, re.sub/translate seguram o GIL e só processos dão paralelismo
+GIL_ATIVO = getattr(sys, '_is_gil_enabled', lambda: True)()
+
+# Recursos NLTK usados pelo preprocessamento: (caminho no nltk_data, pacote)
+RECURSOS_NLTK = (
+    ('corpora/stopwords', 'stopwords'),
+    ('tokenizers/punkt', 'punkt'),
+)
+
+
+def _recurso_nltk_presente(recurso: str) -> bool:
+    """Checagem direta no disco (pasta ou .zip), sem o custo de nltk.data.find."""
+    return any(
+        os.path.exists(os.path.join(diretorio, recurso))
+        or os.path.exists(os.path.join(diretorio, recurso + '.zip'))
+        for diretorio in nltk.data.path
+    )
+
+
+@lru_cache(maxsize=None)
+def garantir_recursos_nltk() -> Tuple[str, ...]:
+    """
+    Baixa os recursos do NLTK que faltarem, uma única vez por processo
+    (chamado ao criar o PreprocessadorTexto, não na importação do módulo).
+
+    Returns:
+        Pacotes que não puderam ser baixados
+    """
+    falhas = []
+    for recurso, pacote in RECURSOS_NLTK:
+        if _recurso_nltk_presente(recurso):
+            continue
+        logger.info(f"Baixando recurso do NLTK: {pacote}...")
+        try:
+            nltk.download(pacote, quiet=True, raise_on_error=True)
+        except Exception as e:
+            logger.warning(f"⚠️ Não foi possível baixar '{pacote}' do NLTK: {e}")
+            falhas.append(pacote)
+    return tuple(falhas)
 
 
 class PreprocessadorTexto:
@@ -42,6 +104,7 @@ class PreprocessadorTexto:
 
         # Carregar stopwords
         if remover_stopwords:
+            garantir_recursos_nltk()
             try:
                 self.stopwords = set(stopwords.words(idioma))
                 logger.info(f"✅ Stopwords carregados ({idioma}): {len(self.stopwords)} palavras")
@@ -58,7 +121,7 @@ class PreprocessadorTexto:
         }
 
         # Atualizar stopwords para não remover palavras importantes
-        self.stopwords = self.stopwords - self.palavras_urgencia
+        self.stopwords = frozenset(self.stopwords - self.palavras_urgencia)
 
     def limpar_url(self, texto: str) -> str:
         """
@@ -70,17 +133,11 @@ class PreprocessadorTexto:
         Returns:
             Texto com URLs substituídas por marcador
         """
-        # Padrão para detectar URLs
-        padrao_url = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
-
-        # Contar URLs antes de remover
-        urls_encontradas = re.findall(padrao_url, texto)
-
-        # Substituir por marcador
-        texto_limpo = re.sub(padrao_url, ' URL_TOKEN ', texto)
+        # Substituir por marcador (subn já devolve quantas URLs foram trocadas)
+        texto_limpo, num_urls = RE_URL.subn(' URL_TOKEN ', texto)
 
-        if urls_encontradas:
-            logger.debug(f"🔗 URLs encontradas: {len(urls_encontradas)}")
+        if num_urls:
+            logger.debug(f"🔗 URLs encontradas: {num_urls}")
 
         return texto_limpo
 
@@ -97,13 +154,10 @@ class PreprocessadorTexto:
         # Preservar URL_TOKEN se existir
         has_url_token = 'URL_TOKEN' in texto
 
-        # Remover pontuação
-        texto = texto.translate(str.maketrans('', '', string.punctuation))
+        # Remover pontuação e caracteres não-ASCII
+        texto = texto.translate(TABELA_LIMPEZA)
 
-        # Remover caracteres não-ASCII
-        texto = texto.encode('ascii', 'ignore').decode('ascii')
-
-        # Restaurar URL_TOKEN
+        # Restaurar URL_TOKEN ('_' é pontuação e também é apagado)
         if has_url_token:
             texto = texto.replace('URLTOKEN', 'URL_TOKEN')
 
@@ -120,7 +174,7 @@ class PreprocessadorTexto:
             Texto com espaços normalizados
         """
         # Remover tabs, newlines, múltiplos espaços
-        texto = re.sub(r'\s+', ' ', texto)
+        texto = RE_ESPACOS.sub(' ', texto)
         return texto.strip()
 
     def remover_stopwords_texto(self, texto: str) -> str:
@@ -128,7 +182,7 @@ class PreprocessadorTexto:
         Remove stopwords do texto.
 
         Args:
-            texto: Texto com stopwords
+            texto: Texto com stopwords, já em minúsculas (como no pipeline)
 
         Returns:
             Texto sem stopwords
@@ -136,13 +190,8 @@ class PreprocessadorTexto:
         if not self.remover_stopwords:
             return texto
 
-        palavras = texto.split()
-        palavras_filtradas = [
-            palavra for palavra in palavras
-            if palavra.lower() not in self.stopwords
-        ]
-
-        return ' '.join(palavras_filtradas)
+        stopwords_ = self.stopwords
+        return ' '.join([palavra for palavra in texto.split() if palavra not in stopwords_])
 
     def processar(self, texto: str) -> str:
         """Pipeline com cache."""
@@ -163,41 +212,71 @@ class PreprocessadorTexto:
         return texto_processado
 
     def _processar_sem_cache(self, texto: str) -> str:
-        """Lógica original de processamento."""
-        # Converter para minúsculas
-        texto = texto.lower()
-
-        # Limpar URLs
-        texto = self.limpar_url(texto)
-
-        # Remover caracteres especiais
-        texto = self.limpar_caracteres_especiais(texto)
+        """
+        Mesmo resultado de limpar_url -> limpar_caracteres_especiais ->
+        normalizar_espacos -> remover_stopwords_texto, numa passagem só.
+        """
+        # Minúsculas e URLs (após lower() o único texto em maiúsculas é o marcador)
+        texto = RE_URL.sub(' URL_TOKEN ', texto.lower())
 
-        # Normalizar espaços
-        texto = self.normalizar_espacos(texto)
+        # Pontuação e não-ASCII; translate também apaga o '_' do marcador
+        texto = texto.translate(TABELA_LIMPEZA)
+        texto = texto.replace('URLTOKEN', 'URL_TOKEN')
 
-        # Remover stopwords
-        texto = self.remover_stopwords_texto(texto)
+        # split() já normaliza os espaços (mesmos caracteres que \s em ASCII);
+        # o texto já está em minúsculas, então a busca nas stopwords é direta
+        palavras = texto.split()
+        if self.remover_stopwords:
+            stopwords_ = self.stopwords
+            palavras = [palavra for palavra in palavras if palavra not in stopwords_]
 
-        return texto
+        return ' '.join(palavras)
 
     def processar_lote(self, textos: List[str], usar_paralelo: bool = True) -> List[str]:
-        """Processa múltiplos textos em paralelo."""
+        """
+        Processa múltiplos textos: remove repetições, consulta o cache em lote
+        e processa só os textos distintos ausentes, em paralelo se forem muitos.
+        """
         logger.info(f"Processando lote de {len(textos)} textos...")
 
-        if not usar_paralelo or len(textos) < 100:
-            # Para lotes pequenos, processar sequencialmente
-            return [self.processar(texto) for texto in textos]
+        # ⚡ Textos distintos (emails repetidos são comuns: campanhas, templates);
+        # entradas vazias ou que não são str resultam em ""
+        unicos = list(dict.fromkeys(texto for texto in textos if isinstance(texto, str) and texto))
+
+        # Uma busca no cache para todos os textos distintos
+        resultados = dict(zip(unicos, self.cache.obter_muitos(unicos)))
+        faltantes = [texto for texto, resultado in resultados.items() if resultado is None]
 
-        # ⚡ Processamento paralelo para lotes grandes
-        num_workers = max(1, cpu_count() - 1)  # Deixar 1 core livre
-        logger.info(f"🚀 Usando {num_workers} processos paralelos")
+        if faltantes:
+            resultados.update(zip(faltantes, self._processar_faltantes(faltantes, usar_paralelo)))
 
-        with Pool(num_workers) as pool:
-            textos_processados = pool.map(self.processar, textos)
+        return [resultados[texto] if isinstance(texto, str) and texto else "" for texto in textos]
 
-        logger.info("✅ Lote processado com sucesso!")
-        return textos_processados
+    def _processar_faltantes(self, faltantes: List[str], usar_paralelo: bool) -> List[str]:
+        """Processa textos ausentes do cache e os adiciona a ele."""
+        num_workers = cpu_count() - 1  # Deixar 1 core livre
+
+        if not usar_paralelo or len(faltantes) < MIN_TEXTOS_PARALELO or num_workers < 2:
+            # Lotes pequenos (ou um só worker): sequencial, sem custo de fork/pickle
+            processados = [self._processar_sem_cache(texto) for texto in faltantes]
+        else:
+            # ⚡ Processamento paralelo para lotes grandes, em blocos (menos IPC por texto)
+            chunksize = max(1, len(faltantes) // (num_workers * 4))
+
+            if GIL_ATIVO:
+                logger.info(f"🚀 Usando {num_workers} processos paralelos")
+                with Pool(num_workers) as pool:
+                    processados = pool.map(self._processar_sem_cache, faltantes, chunksize=chunksize)
+            else:
+                logger.info(f"🚀 Usando {num_workers} threads paralelas")
+                with ThreadPoolExecutor(max_workers=num_workers) as executor:
+                    processados = list(executor.map(self._processar_sem_cache, faltantes))
+
+            logger.info("✅ Lote processado com sucesso!")
+
+        # Resultados dos workers também vão para o cache do processo principal
+        self.cache.adicionar_muitos(faltantes, processados)
+        return processados
 
 
 # Função de conveniência para uso rápido
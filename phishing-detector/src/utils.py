@@ -4,12 +4,24 @@ Inclui operações de I/O, logging e utilitários gerais.
 """
 
 import os
+import re
+import hashlib
+import mmap
 import pickle
+import pickletools
+import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
 import logging
-from typing import Tuple, Any
+from typing import Tuple, Any, Optional
 from datetime import datetime
 
+try:
+    import zstandard
+    ZSTD_DISPONIVEL = True
+except ImportError:  # zstandard é opcional: só necessário para modelos .zst
+    ZSTD_DISPONIVEL = False
+
 # Configurar logging
 logging.basicConfig(
     level=logging.INFO,
@@ -17,16 +29,130 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Início de todo frame zstd (identifica modelos comprimidos, qualquer que seja a extensão)
+MAGIC_ZSTD = b'\x28\xb5\x2f\xfd'
+
+# Linhas lidas por vez do CSV em carregar_dataset (limita o pico de memória)
+TAMANHO_CHUNK_CSV = 128_000
+
+# Diretório do cache Parquet de carregar_dataset (o mesmo do CachePreprocessamento)
+DIRETORIO_CACHE_DATASET = 'cache'
+
+# Palavras-chave que identificam as labels em carregar_dataset (compiladas uma vez)
+RE_LABEL_PHISHING = re.compile(r'phish|spam|malicious|unsafe|scam', re.IGNORECASE)
+RE_LABEL_LEGITIMO = re.compile(r'safe|ham|legitimate|normal|legit', re.IGNORECASE)
+
+# Valores lidos como nulos (os padrões do pandas.read_csv)
+VALORES_NULOS_CSV = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+    '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+]
+
+
+def _ler_colunas_csv(caminho: str, coluna_texto: str,
+                     coluna_label: str) -> Tuple[pd.Series, pd.Series, int]:
+    """
+    Lê só as colunas de texto e label do CSV, já sem linhas nulas.
+    Usa o leitor de CSV do pyarrow (multithread, strings sem objetos Python
+    por linha) se disponível; senão, ou se ele não conseguir ler o arquivo,
+    o pandas em blocos.
+
+    Returns:
+        Tupla (textos como 'string', labels como 'category', total de linhas lidas)
+    """
+    try:
+        return _ler_colunas_csv_arrow(caminho, coluna_texto, coluna_label)
+    except ImportError:
+        pass
+    except Exception as e:
+        logger.warning("⚠️  pyarrow não conseguiu ler o CSV (%s); usando pandas", e)
+
+    # Ler apenas as duas colunas usadas, com tipos explícitos (sem inferência),
+    # em blocos: nulos são removidos bloco a bloco, sem uma cópia do CSV inteiro
+    leitor = pd.read_csv(
+        caminho, encoding='utf-8', engine='c',
+        usecols=[coluna_texto, coluna_label],
+        dtype={coluna_texto: 'string', coluna_label: 'category'},
+        chunksize=TAMANHO_CHUNK_CSV
+    )
+    partes_texto, partes_label = [], []
+    total_linhas = 0
+    with leitor:
+        for bloco in leitor:
+            total_linhas += len(bloco)
+            # Remover valores nulos: uma máscara e uma seleção por coluna
+            # (sem a cópia intermediária do bloco que o dropna faria)
+            texto, label = bloco[coluna_texto], bloco[coluna_label]
+            validos = texto.notna().to_numpy() & label.notna().to_numpy()
+            partes_texto.append(texto[validos])
+            partes_label.append(label[validos])
+
+    textos = pd.concat(partes_texto) if partes_texto else pd.Series([], dtype='string', name=coluna_texto)
+    # Cada bloco tem suas próprias categorias: unir antes de mapear
+    rotulos = pd.Series(
+        union_categoricals(partes_label) if partes_label else pd.Categorical([]),
+        index=textos.index, name=coluna_label
+    )
+    return textos, rotulos, total_linhas
+
+
+def _ler_colunas_csv_arrow(caminho: str, coluna_texto: str,
+                           coluna_label: str) -> Tuple[pd.Series, pd.Series, int]:
+    """Versão de _ler_colunas_csv com pyarrow.csv (ImportError se não instalado)."""
+    import pyarrow as pa
+    import pyarrow.compute as pa_compute
+    import pyarrow.csv as pa_csv
+
+    # Emails têm quebras de linha dentro de aspas: um registro não pode cruzar
+    # blocos, então o arquivo é lido num bloco só (até 1 GiB)
+    tamanho_bloco = min(max(os.path.getsize(caminho) + 1, 8 << 20), 1 << 30)
+
+    tabela = pa_csv.read_csv(
+        caminho,
+        read_options=pa_csv.ReadOptions(block_size=tamanho_bloco),
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=[coluna_texto, coluna_label],
+            column_types={coluna_texto: pa.string(),
+                          coluna_label: pa.dictionary(pa.int32(), pa.string())},
+            # Mesmos valores que o pandas trata como nulos
+            strings_can_be_null=True,
+            null_values=VALORES_NULOS_CSV
+        )
+    )
+
+    total_linhas = tabela.num_rows
+
+    # Remover valores nulos ainda no Arrow: só as linhas válidas viram pandas
+    # (o índice continua sendo a posição da linha no CSV, como no pandas)
+    indice = None
+    if tabela[coluna_texto].null_count or tabela[coluna_label].null_count:
+        validos = pa_compute.and_(pa_compute.is_valid(tabela[coluna_texto]),
+                                  pa_compute.is_valid(tabela[coluna_label]))
+        indice = np.flatnonzero(validos.to_numpy(zero_copy_only=False))
+        tabela = tabela.filter(validos)
+
+    df = tabela.to_pandas(types_mapper={pa.string(): pd.StringDtype()}.get)
+    del tabela
+    if indice is not None:
+        df.index = indice
+
+    return df[coluna_texto], df[coluna_label], total_linhas
+
 
 def carregar_dataset(caminho: str, coluna_texto: str = 'text',
-                     coluna_label: str = 'label') -> Tuple[pd.Series, pd.Series]:
+                     coluna_label: str = 'label', usar_cache: bool = True) -> Tuple[pd.Series, pd.Series]:
     """
     Carrega dataset de emails a partir de arquivo CSV.
 
+    O resultado (textos e labels já convertidas) fica em cache num Parquet em
+    cache/ (ver _caminho_cache_dataset) e é relido dali enquanto o CSV não mudar.
+
     Args:
         caminho: Caminho para o arquivo CSV
         coluna_texto: Nome da coluna contendo o texto dos emails
         coluna_label: Nome da coluna contendo as labels (0=legítimo, 1=phishing)
+        usar_cache: Se deve ler/gravar o cache Parquet
 
     Returns:
         Tupla (textos, labels) como pandas Series
@@ -35,87 +161,160 @@ def carregar_dataset(caminho: str, coluna_texto: str = 'text',
         FileNotFoundError: Se o arquivo não existir
         KeyError: Se as colunas especificadas não existirem
     """
-    logger.info(f"Carregando dataset de: {caminho}")
+    logger.info("Carregando dataset de: %s", caminho)
 
     if not os.path.exists(caminho):
         raise FileNotFoundError(f"Arquivo não encontrado: {caminho}")
 
+    if usar_cache:
+        em_cache = _ler_cache_dataset(caminho, coluna_texto, coluna_label)
+        if em_cache is not None:
+            return em_cache
+
     try:
-        df = pd.read_csv(caminho, encoding='utf-8')
-        logger.info(f"✅ Dataset carregado: {len(df)} exemplos")
+        # Só o cabeçalho, para validar as colunas antes de ler o arquivo todo
+        colunas = pd.read_csv(caminho, encoding='utf-8', nrows=0).columns.tolist()
 
         # Debug: mostrar colunas disponíveis
-        logger.info(f"📋 Colunas encontradas: {df.columns.tolist()}")
+        logger.info("📋 Colunas encontradas: %s", colunas)
 
         # Verificar colunas necessárias
-        if coluna_texto not in df.columns:
-            raise KeyError(f"Coluna '{coluna_texto}' não encontrada. Colunas disponíveis: {df.columns.tolist()}")
-        if coluna_label not in df.columns:
-            raise KeyError(f"Coluna '{coluna_label}' não encontrada. Colunas disponíveis: {df.columns.tolist()}")
+        if coluna_texto not in colunas:
+            raise KeyError(f"Coluna '{coluna_texto}' não encontrada. Colunas disponíveis: {colunas}")
+        if coluna_label not in colunas:
+            raise KeyError(f"Coluna '{coluna_label}' não encontrada. Colunas disponíveis: {colunas}")
 
-        # Remover valores nulos
-        df = df.dropna(subset=[coluna_texto, coluna_label])
-        logger.info(f"📊 Após remoção de nulos: {len(df)} exemplos")
+        textos, rotulos, total_linhas = _ler_colunas_csv(caminho, coluna_texto, coluna_label)
+        logger.info("✅ Dataset carregado: %d exemplos", total_linhas)
+
+        logger.info("📊 Após remoção de nulos: %d exemplos", len(textos))
+
+        # Categorias são lidas como texto: labels numéricas (0/1) voltam a ser números
+        rotulos = rotulos.cat.remove_unused_categories()
+        try:
+            rotulos = rotulos.cat.rename_categories(pd.to_numeric(rotulos.cat.categories))
+        except (ValueError, TypeError):
+            pass
 
         # Converter labels de texto para numérico (0 e 1)
-        labels_originais = df[coluna_label].unique()
-        logger.info(f"🏷️  Labels originais encontradas: {labels_originais}")
+        labels_originais = rotulos.cat.categories
+        log_info = logger.isEnabledFor(logging.INFO)
+        if log_info:
+            logger.info("🏷️  Labels originais encontradas: %s", labels_originais.tolist())
 
         # Mapear labels para 0 (legítimo) e 1 (phishing)
-        # Detectar automaticamente qual é phishing baseado em palavras-chave
-        label_mapping = {}
-
-        for label in labels_originais:
-            label_lower = str(label).lower()
-            # Se contém "phish", "spam", "malicious", "unsafe" -> 1 (phishing)
-            if any(word in label_lower for word in ['phish', 'spam', 'malicious', 'unsafe', 'scam']):
-                label_mapping[label] = 1
-            # Se contém "safe", "ham", "legitimate", "normal" -> 0 (legítimo)
-            elif any(word in label_lower for word in ['safe', 'ham', 'legitimate', 'normal', 'legit']):
-                label_mapping[label] = 0
-            else:
-                # Se não conseguir detectar, assumir pela ordem alfabética
-                # (geralmente "Phishing Email" vem depois de "Safe Email")
-                label_mapping[label] = 1 if label == max(labels_originais) else 0
+        # Detectar automaticamente qual é phishing baseado em palavras-chave,
+        # de uma vez para todas as categorias (não por linha)
+        nomes = labels_originais.astype(str)
+        # Se contém "phish", "spam", "malicious", "unsafe" -> 1 (phishing)
+        e_phishing = nomes.str.contains(RE_LABEL_PHISHING)
+        # Se contém "safe", "ham", "legitimate", "normal" -> 0 (legítimo)
+        e_legitimo = nomes.str.contains(RE_LABEL_LEGITIMO)
+        # Se não conseguir detectar, assumir pela ordem alfabética
+        # (geralmente "Phishing Email" vem depois de "Safe Email")
+        e_maximo = labels_originais == labels_originais.max()
+
+        mapa = np.where(e_phishing, 1, np.where(e_legitimo, 0, e_maximo)).astype(np.int8)
+        if log_info:
+            label_mapping = dict(zip(labels_originais.tolist(), mapa.tolist()))
+            logger.info("🔄 Mapeamento de labels: %s", label_mapping)
+
+        # Códigos das categorias indexam o mapa: todas as labels são mapeadas
+        labels = pd.Series(mapa[rotulos.cat.codes.to_numpy()], index=textos.index, name='label_numeric')
 
-        logger.info(f"🔄 Mapeamento de labels: {label_mapping}")
+        # Exibir distribuição de classes
+        if log_info:
+            distribuicao = labels.value_counts()
+            logger.info("📈 Distribuição - Legítimos (0): %d | Phishing (1): %d",
+                        distribuicao.get(0, 0), distribuicao.get(1, 0))
 
-        df['label_numeric'] = df[coluna_label].map(label_mapping)
+        if usar_cache:
+            _salvar_cache_dataset(caminho, textos, labels, coluna_texto, coluna_label)
 
-        # Verificar se há valores não mapeados
-        if df['label_numeric'].isna().any():
-            logger.warning("⚠️  Algumas labels não foram mapeadas corretamente!")
-            logger.warning(f"Labels problemáticas: {df[df['label_numeric'].isna()][coluna_label].unique()}")
-            # Remover linhas com labels não mapeadas
-            df = df.dropna(subset=['label_numeric'])
+        return textos, labels
 
-        # Exibir distribuição de classes
-        distribuicao = df['label_numeric'].value_counts()
-        logger.info(f"📈 Distribuição - Legítimos (0): {distribuicao.get(0, 0)} | Phishing (1): {distribuicao.get(1, 0)}")
+    except Exception as e:
+        logger.error("❌ Erro ao carregar dataset: %s", e)
+        raise
+
+
+def _caminho_cache_dataset(caminho: str) -> str:
+    """
+    Caminho do cache Parquet de um CSV: cache/<nome>-<hash do caminho>.parquet.
+    O hash do caminho absoluto evita colisão entre CSVs de mesmo nome.
+    """
+    caminho_absoluto = os.path.abspath(caminho)
+    digest = hashlib.blake2b(caminho_absoluto.encode('utf-8'), digest_size=4).hexdigest()
+    nome = os.path.splitext(os.path.basename(caminho_absoluto))[0]
+    return os.path.join(DIRETORIO_CACHE_DATASET, f"{nome}-{digest}.parquet")
 
-        return df[coluna_texto], df['label_numeric'].astype(int)
 
+def _ler_cache_dataset(caminho: str, coluna_texto: str,
+                       coluna_label: str) -> Optional[Tuple[pd.Series, pd.Series]]:
+    """
+    Lê o cache Parquet de carregar_dataset, se existir, for mais novo que o
+    CSV e tiver sido gerado para as mesmas colunas.
+
+    Returns:
+        Tupla (textos, labels), ou None se não houver cache válido
+    """
+    caminho_cache = _caminho_cache_dataset(caminho)
+    if not os.path.exists(caminho_cache) or os.path.getmtime(caminho_cache) <= os.path.getmtime(caminho):
+        return None
+
+    try:
+        df = pd.read_parquet(caminho_cache)
     except Exception as e:
-        logger.error(f"❌ Erro ao carregar dataset: {str(e)}")
-        raise
+        logger.warning("⚠️  Erro ao ler cache do dataset (%s); lendo o CSV", e)
+        return None
+
+    # O cache guarda as colunas com os nomes de origem: outras colunas, outro cache
+    if df.columns.tolist() != [coluna_texto, coluna_label]:
+        return None
 
+    logger.info("⚡ Dataset carregado do cache: %s (%d exemplos)", caminho_cache, len(df))
+    # int8 como no caminho do CSV (no-op para caches gravados por esta versão)
+    return df[coluna_texto], df[coluna_label].astype(np.int8).rename('label_numeric')
 
-def salvar_modelo(modelo: Any, caminho: str, metadata: dict = None) -> None:
+
+def _salvar_cache_dataset(caminho: str, textos: pd.Series, labels: pd.Series,
+                          coluna_texto: str, coluna_label: str) -> None:
+    """Grava o cache Parquet (snappy) de carregar_dataset; falhas só geram aviso."""
+    caminho_cache = _caminho_cache_dataset(caminho)
+    try:
+        os.makedirs(os.path.dirname(caminho_cache), exist_ok=True)
+        pd.DataFrame({coluna_texto: textos, coluna_label: labels}).to_parquet(
+            caminho_cache, compression='snappy'
+        )
+        logger.info("💾 Cache do dataset salvo: %s", caminho_cache)
+    except Exception as e:
+        logger.warning("⚠️  Não foi possível salvar o cache do dataset: %s", e)
+
+
+def salvar_modelo(modelo: Any, caminho: str, metadata: dict = None,
+                  otimizar_pickle: bool = True) -> None:
     """
     Salva modelo treinado em arquivo pickle.
+    Se o caminho terminar em .zst (ex.: modelo.pkl.zst), o pickle é
+    comprimido com zstandard.
 
     Args:
         modelo: Objeto do modelo (sklearn pipeline ou modelo individual)
-        caminho: Caminho onde salvar o arquivo .pkl
+        caminho: Caminho onde salvar o arquivo .pkl (ou .pkl.zst)
         metadata: Dicionário com informações adicionais (acurácia, data, etc.)
+        otimizar_pickle: Se deve passar o pickle por pickletools.optimize
+            (remove PUTs não usados: arquivo menor e load mais rápido)
     """
     logger.info(f"Salvando modelo em: {caminho}")
 
-    # Criar diretório se não existir
+    # Criar diretório se não existir (makedirs já verifica: sem stat extra)
     diretorio = os.path.dirname(caminho)
-    if diretorio and not os.path.exists(diretorio):
-        os.makedirs(diretorio)
-        logger.info(f"📁 Diretório criado: {diretorio}")
+    if diretorio:
+        try:
+            os.makedirs(diretorio)
+            logger.info(f"📁 Diretório criado: {diretorio}")
+        except FileExistsError:
+            pass
 
     # Adicionar timestamp ao metadata
     if metadata is None:
@@ -129,10 +328,22 @@ def salvar_modelo(modelo: Any, caminho: str, metadata: dict = None) -> None:
     }
 
     try:
+        # Protocolo 5: arrays numpy (coeficientes, idf) serializados em bloco
+        dados = pickle.dumps(dados_salvamento, protocol=pickle.HIGHEST_PROTOCOL)
+        if otimizar_pickle:
+            dados = pickletools.optimize(dados)
+
+        if caminho.endswith('.zst'):
+            if not ZSTD_DISPONIVEL:
+                raise ImportError("zstandard não instalado (pip install zstandard) para salvar .zst")
+            dados = zstandard.ZstdCompressor(level=3, threads=-1).compress(dados)
+
+        # Payload já montado em memória: um único write (maior que o buffer, vai direto ao arquivo)
         with open(caminho, 'wb') as f:
-            pickle.dump(dados_salvamento, f)
+            f.write(dados)
 
-        tamanho_mb = os.path.getsize(caminho) / (1024 * 1024)
+        # Tamanho do que foi gravado (sem stat do arquivo)
+        tamanho_mb = len(dados) / (1024 * 1024)
         logger.info(f"✅ Modelo salvo com sucesso! Tamanho: {tamanho_mb:.2f} MB")
 
         if metadata:
@@ -145,10 +356,11 @@ def salvar_modelo(modelo: Any, caminho: str, metadata: dict = None) -> None:
 
 def carregar_modelo(caminho: str) -> Tuple[Any, dict]:
     """
-    Carrega modelo treinado de arquivo pickle.
+    Carrega modelo treinado de arquivo pickle (comprimido com zstandard
+    ou não: o formato é detectado pelos primeiros bytes).
 
     Args:
-        caminho: Caminho do arquivo .pkl
+        caminho: Caminho do arquivo .pkl (ou .pkl.zst)
 
     Returns:
         Tupla (modelo, metadata)
@@ -162,8 +374,14 @@ def carregar_modelo(caminho: str) -> Tuple[Any, dict]:
         raise FileNotFoundError(f"Modelo não encontrado: {caminho}")
 
     try:
-        with open(caminho, 'rb') as f:
-            dados = pickle.load(f)
+        # Arquivo mapeado em memória: o SO pagina sob demanda, sem cópias de leitura
+        with open(caminho, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[:len(MAGIC_ZSTD)] == MAGIC_ZSTD:
+                if not ZSTD_DISPONIVEL:
+                    raise ImportError("Modelo comprimido com zstd: instale o zstandard (pip install zstandard)")
+                dados = pickle.loads(zstandard.ZstdDecompressor().decompressobj().decompress(mm))
+            else:
+                dados = pickle.load(mm)
 
         # Compatibilidade com modelos salvos sem metadata
         if isinstance(dados, dict) and 'modelo' in dados:
@@ -222,32 +440,33 @@ def criar_dataset_exemplo(caminho_saida: str = 'dados/exemplo.csv', n_exemplos:
         "Project update: Phase 1 completed successfully. Moving to Phase 2 next month."
     ]
 
-    # Replicar para atingir n_exemplos
-    textos = []
-    labels = []
-
-    for i in range(n_exemplos):
-        if i % 2 == 0:
-            textos.append(phishing[i % len(phishing)])
-            labels.append(1)  # phishing
-        else:
-            textos.append(legitimo[i % len(legitimo)])
-            labels.append(0)  # legítimo
-
-    # Criar DataFrame e salvar
-    df = pd.DataFrame({
-        'text': textos,
-        'label': labels
-    })
+    # Replicar para atingir n_exemplos: posições pares são phishing, ímpares
+    # legítimas, e a posição i usa o exemplo i % len(lista)
+    indices = np.arange(n_exemplos)
+    textos = np.empty(n_exemplos, dtype=object)
+    textos[0::2] = np.asarray(phishing, dtype=object)[indices[0::2] % len(phishing)]
+    textos[1::2] = np.asarray(legitimo, dtype=object)[indices[1::2] % len(legitimo)]
+    labels = np.tile([1, 0], (n_exemplos + 1) // 2)[:n_exemplos]  # 1=phishing, 0=legítimo
 
     # Criar diretório se não existir
     diretorio = os.path.dirname(caminho_saida)
-    if diretorio and not os.path.exists(diretorio):
-        os.makedirs(diretorio)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+
+    # pyarrow grava o CSV em blocos (strings sempre entre aspas); sem ele, pandas
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+        pa_csv.write_csv(pa.table({'text': pa.array(textos, type=pa.string()), 'label': labels}),
+                         caminho_saida)
+    except ImportError:
+        pd.DataFrame({
+            'text': textos,
+            'label': labels
+        }).to_csv(caminho_saida, index=False, encoding='utf-8')
 
-    df.to_csv(caminho_saida, index=False, encoding='utf-8')
     logger.info(f"✅ Dataset de exemplo criado: {caminho_saida}")
-    logger.info(f"📊 Total: {len(df)} exemplos (50% phishing, 50% legítimo)")
+    logger.info(f"📊 Total: {n_exemplos} exemplos (50% phishing, 50% legítimo)")
 
 
 def exibir_estatisticas(y_true, y_pred) -> None:
@@ -258,12 +477,17 @@ def exibir_estatisticas(y_true, y_pred) -> None:
         y_true: Labels verdadeiros
         y_pred: Labels preditos
     """
-    from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
-
-    acc = accuracy_score(y_true, y_pred)
-    prec = precision_score(y_true, y_pred)
-    rec = recall_score(y_true, y_pred)
-    f1 = f1_score(y_true, y_pred)
+    # Matriz de confusão em uma passagem (índice = real * 2 + predito);
+    # as quatro métricas saem das suas contagens
+    y_true = np.asarray(y_true, dtype=np.int8)
+    y_pred = np.asarray(y_pred, dtype=np.int8)
+    tn, fp, fn, tp = np.bincount(y_true * 2 + y_pred, minlength=4).tolist()
+
+    # Divisão por zero vale 0.0, como no sklearn (zero_division padrão)
+    acc = (tp + tn) / max(tp + tn + fp + fn, 1)
+    prec = tp / (tp + fp) if tp + fp else 0.0
+    rec = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * tp / (2 * tp + fp + fn) if tp else 0.0
 
     print("\n" + "=" * 50)
     print("📊 MÉTRICAS DE PERFORMANCE")
@@ -0,0 +1,61 @@
+"""
+Fixtures compartilhadas dos testes: dados sintéticos pequenos e diretório
+de trabalho isolado (o cache de preprocessamento grava em cache/ relativo).
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Permitir `from src...` como nos scripts da raiz do projeto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PALAVRAS_PHISHING = ['urgent', 'verify', 'account', 'click', 'password', 'bank',
+                     'prize', 'suspended', 'confirm', 'winner', 'refund', 'login']
+PALAVRAS_LEGITIMO = ['meeting', 'report', 'team', 'project', 'schedule', 'lunch',
+                     'review', 'agenda', 'invoice', 'thanks', 'update', 'office']
+PALAVRAS_COMUNS = ['the', 'your', 'please', 'today', 'email', 'attached', 'week']
+
+
+def _gerar_emails(n: int, semente: int = 0):
+    """
+    Gera n emails sintéticos alternando phishing (1) e legítimo (0).
+
+    Returns:
+        Tupla (lista de textos, array int8 de labels)
+    """
+    rng = np.random.default_rng(semente)
+    textos, labels = [], np.tile(np.array([1, 0], dtype=np.int8), (n + 1) // 2)[:n]
+    for label in labels:
+        palavras = PALAVRAS_PHISHING if label else PALAVRAS_LEGITIMO
+        corpo = list(rng.choice(palavras, size=6)) + list(rng.choice(PALAVRAS_COMUNS, size=4))
+        rng.shuffle(corpo)
+        texto = ' '.join(corpo)
+        if label and rng.random() < 0.5:
+            texto = texto.upper() + ' http://example.com/login $100!!!'
+        textos.append(texto)
+    return textos, labels
+
+
+@pytest.fixture(scope='session', autouse=True)
+def diretorio_trabalho(tmp_path_factory):
+    """Executa os testes num diretório temporário (cache/ fica fora do repo)."""
+    diretorio = tmp_path_factory.mktemp('trabalho')
+    anterior = os.getcwd()
+    os.chdir(diretorio)
+    yield diretorio
+    os.chdir(anterior)
+
+
+@pytest.fixture(scope='session')
+def gerar_emails():
+    """Fábrica de emails sintéticos: gerar_emails(n, semente) -> (textos, labels)."""
+    return _gerar_emails
+
+
+@pytest.fixture(scope='session')
+def emails():
+    """200 emails sintéticos balanceados."""
+    return _gerar_emails(200)
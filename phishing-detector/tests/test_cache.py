@@ -0,0 +1,147 @@
+"""
+Testes do CachePreprocessamento (SQLite): persistência entre instâncias,
+versão das entradas, migração de formatos antigos (tabela e pickle), LRU
+em memória e acesso concorrente (uma instância compartilhada pelo app).
+"""
+
+import pickle
+import sqlite3
+import sys
+import threading
+
+from src import cache as modulo_cache
+from src.cache import CachePreprocessamento
+
+
+def test_entradas_persistem_entre_instancias(tmp_path):
+    caminho = str(tmp_path / 'cache.sqlite')
+    cache = CachePreprocessamento(caminho)
+    cache.adicionar('Texto Original', 'texto processado')
+    assert cache.obter('Texto Original') == 'texto processado'
+    cache.salvar_cache()
+
+    novo = CachePreprocessamento(caminho)
+    assert novo.obter('Texto Original') == 'texto processado'
+    assert novo.obter('outro texto') is None
+
+
+def test_estatisticas_nao_contam_pendente_ja_gravado(tmp_path):
+    cache = CachePreprocessamento(str(tmp_path / 'cache.sqlite'))
+    assert cache.estatisticas()['total_entradas'] == 0
+
+    cache.adicionar('a', 'pa')
+    cache.adicionar('b', 'pb')
+    cache.salvar_cache()
+    cache.adicionar('a', 'pa nova')  # regravação de chave já no disco
+    cache.adicionar('c', 'pc')
+
+    assert cache.estatisticas()['total_entradas'] == 3
+    cache.salvar_cache()
+    assert cache.estatisticas()['total_entradas'] == 3
+
+
+def test_cache_sem_arquivo_nao_cria_sqlite(tmp_path):
+    caminho = tmp_path / 'cache.sqlite'
+    assert CachePreprocessamento(str(caminho)).obter('texto') is None
+    assert not caminho.exists()
+
+
+def test_pickle_de_cache_antigo_pkl(tmp_path):
+    cache = CachePreprocessamento(str(tmp_path / 'cache.pkl'), tamanho_memoria=5)
+    restaurado = pickle.loads(pickle.dumps(cache))
+
+    assert restaurado.caminho_cache == str(tmp_path / 'cache.sqlite')
+    assert restaurado.tamanho_memoria == 5
+
+
+def test_obter_muitos_memoria_pendentes_e_disco(tmp_path):
+    caminho = str(tmp_path / 'cache.sqlite')
+    cache = CachePreprocessamento(caminho)
+    cache.adicionar_muitos(['a', 'b'], ['pa', 'pb'])
+    cache.salvar_cache()
+
+    novo = CachePreprocessamento(caminho)
+    novo.adicionar('c', 'pc')  # só pendente
+    assert novo.obter_muitos(['b', 'x', 'a', 'c', 'b']) == ['pb', None, 'pa', 'pc', 'pb']
+    assert novo.obter_muitos([]) == []
+
+
+def test_migracao_da_tabela_antiga(tmp_path):
+    caminho = str(tmp_path / 'cache.sqlite')
+    chave = CachePreprocessamento(caminho)._gerar_hash('email antigo')
+    with sqlite3.connect(caminho) as conn:
+        conn.execute('CREATE TABLE cache (k INTEGER PRIMARY KEY, v TEXT)')
+        conn.execute('INSERT INTO cache (k, v) VALUES (?, ?)', (chave, 'email antigo processado'))
+
+    cache = CachePreprocessamento(caminho)
+    assert cache.obter('email antigo') == 'email antigo processado'
+
+    with sqlite3.connect(caminho) as conn:
+        assert 'versao' in [linha[1] for linha in conn.execute('PRAGMA table_info(cache)')]
+        assert conn.execute('SELECT versao FROM cache').fetchall() == [(1,)]
+        assert conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'cache_antigo'").fetchone() is None
+
+
+def test_outra_versao_nao_le_entradas(tmp_path, monkeypatch):
+    caminho = str(tmp_path / 'cache.sqlite')
+    cache = CachePreprocessamento(caminho)
+    cache.adicionar('texto', 'processado v1')
+    cache.salvar_cache()
+
+    monkeypatch.setattr(CachePreprocessamento, 'VERSAO', CachePreprocessamento.VERSAO + 1)
+    assert CachePreprocessamento(caminho).obter('texto') is None
+
+
+def test_lru_descarta_a_menos_usada(tmp_path):
+    cache = CachePreprocessamento(str(tmp_path / 'cache.sqlite'), tamanho_memoria=2)
+    cache.adicionar('a', 'pa')
+    cache.adicionar('b', 'pb')
+    cache.obter('a')  # 'b' passa a ser a menos usada
+    cache.adicionar('c', 'pc')
+
+    assert list(cache.cache_memoria.values()) == ['pa', 'pc']
+
+
+def test_acesso_concorrente(tmp_path, monkeypatch):
+    # Gravações automáticas frequentes e LRU pequena: força despejos e
+    # salvar_cache concorrendo com leituras e escritas de outras threads
+    monkeypatch.setattr(modulo_cache, '_MAX_PENDENTES', 25)
+    intervalo = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # trocas de thread frequentes: expõe as corridas
+    caminho = str(tmp_path / 'cache.sqlite')
+    cache = CachePreprocessamento(caminho, tamanho_memoria=16)
+    erros = []
+
+    def trabalhar(thread: int):
+        try:
+            for rodada in range(100):
+                textos = [f't{thread}-{rodada}-{i}' for i in range(5)]
+                cache.adicionar_muitos(textos, [t.upper() for t in textos])
+                assert cache.obter_muitos(textos) == [t.upper() for t in textos]
+                assert cache.obter(textos[0]) == textos[0].upper()
+        except Exception as e:  # falhas em outras threads não chegam ao pytest
+            erros.append(e)
+
+    threads = [threading.Thread(target=trabalhar, args=(i,)) for i in range(4)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(intervalo)
+    cache.salvar_cache()
+
+    assert erros == []
+    textos = [f't{thread}-{rodada}-{i}' for thread in range(4) for rodada in range(100) for i in range(5)]
+    novo = CachePreprocessamento(caminho)
+    assert novo.obter_muitos(textos) == [t.upper() for t in textos]
+
+
+def test_falha_ao_salvar_mantem_pendentes(tmp_path):
+    cache = CachePreprocessamento(str(tmp_path / 'nao_e_diretorio' / 'cache.sqlite'))
+    (tmp_path / 'nao_e_diretorio').write_text('arquivo no lugar do diretório')
+    cache.adicionar('texto', 'processado')
+
+    cache.salvar_cache()
+    assert cache._pendentes == {cache._gerar_hash('texto'): 'processado'}
@@ -0,0 +1,65 @@
+"""
+Testes de predição do DetectorPhishing: lotes vazios e consistência entre
+predizer, predizer_rapido e analisar_emails.
+"""
+
+import contextlib
+import io
+import os
+
+import numpy as np
+import pytest
+
+from src.modelo import DetectorPhishing
+
+CAMINHO_MODELO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              'modelo', 'detector_phishing.pkl')
+
+
+@pytest.fixture(scope='module')
+def detector(emails):
+    """Detector treinado com os emails sintéticos."""
+    textos, labels = emails
+    detector = DetectorPhishing(max_features=500)
+    with contextlib.redirect_stdout(io.StringIO()):
+        detector.treinar(textos, labels, validacao_cruzada=False)
+    return detector
+
+
+@pytest.fixture(scope='module')
+def detector_distribuido():
+    """Modelo distribuído em modelo/ (StandardScaler denso, float64)."""
+    if not os.path.exists(CAMINHO_MODELO):
+        pytest.skip('modelo/detector_phishing.pkl não encontrado')
+    return DetectorPhishing.carregar(CAMINHO_MODELO)
+
+
+def _verificar_lote_vazio(detector):
+    for predizer in (detector.predizer, detector.predizer_rapido):
+        predicoes, probabilidades = predizer([])
+        assert predicoes.shape == probabilidades.shape == (0,)
+    assert detector.analisar_emails([]) == []
+
+
+def test_lote_vazio(detector):
+    _verificar_lote_vazio(detector)
+
+
+@pytest.mark.filterwarnings('ignore::sklearn.exceptions.InconsistentVersionWarning')
+def test_lote_vazio_modelo_distribuido(detector_distribuido):
+    _verificar_lote_vazio(detector_distribuido)
+
+
+def test_lote_vazio_sem_caminho_rapido(detector, monkeypatch):
+    monkeypatch.setattr(detector, '_coeficientes_binarios', lambda: None)
+    predicoes, probabilidades = detector.predizer(iter([]))
+    assert predicoes.shape == probabilidades.shape == (0,)
+
+
+def test_analisar_emails_igual_a_analisar_email(detector, gerar_emails):
+    textos, _ = gerar_emails(12, semente=4)
+    for resultado, texto in zip(detector.analisar_emails(textos), textos):
+        individual = detector.analisar_email(texto)
+        assert resultado['classificacao'] == individual['classificacao']
+        assert resultado['nivel_risco'] == individual['nivel_risco']
+        assert resultado['confianca'] == pytest.approx(individual['confianca'], abs=1e-12)
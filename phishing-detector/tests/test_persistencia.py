@@ -0,0 +1,148 @@
+"""
+Round trips de salvamento/carregamento do DetectorPhishing: as predições do
+modelo carregado devem ser idênticas às do modelo original.
+"""
+
+import contextlib
+import io
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from src.modelo import DetectorPhishing
+from src.utils import MAGIC_ZSTD
+
+
+def _silencioso(funcao, *args, **kwargs):
+    """Executa sem a saída de métricas impressa no console."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return funcao(*args, **kwargs)
+
+
+@pytest.fixture(scope='module')
+def detector_padrao(emails):
+    """Detector treinado com TF-IDF de vocabulário e LogisticRegression."""
+    textos, labels = emails
+    detector = DetectorPhishing(max_features=500)
+    _silencioso(detector.treinar, textos, labels, validacao_cruzada=False)
+    return detector
+
+
+@pytest.fixture(scope='module')
+def detector_hashing(emails):
+    """Detector com TF-IDF via HashingVectorizer (usar_hashing=True)."""
+    textos, labels = emails
+    detector = DetectorPhishing(usar_hashing=True)
+    _silencioso(detector.treinar, textos, labels, validacao_cruzada=False)
+    return detector
+
+
+@pytest.fixture(scope='module')
+def detector_incremental(emails):
+    """Detector treinado em lotes (SGD)."""
+    textos, labels = emails
+    detector = DetectorPhishing(max_features=500)
+    _silencioso(detector.treinar_incremental, textos, labels, tamanho_lote=50)
+    return detector
+
+
+def _salvar_e_carregar(detector, formato, diretorio):
+    """Salva no formato pedido e carrega de volta."""
+    if formato == 'safetensors':
+        pytest.importorskip('safetensors')
+        caminho = str(diretorio / 'detector.safetensors')
+        detector.salvar_safetensors(caminho)
+        return DetectorPhishing.carregar_safetensors(caminho)
+
+    if formato == 'pkl.zst':
+        pytest.importorskip('zstandard')
+    caminho = str(diretorio / f'detector.{formato}')
+    detector.salvar(caminho)
+    return DetectorPhishing.carregar(caminho)
+
+
+def _verificar_round_trip(detector, formato, diretorio, textos):
+    """As predições do modelo carregado devem ser idênticas às do original."""
+    carregado = _salvar_e_carregar(detector, formato, diretorio)
+
+    pred_original, proba_original = detector.predizer(textos)
+    pred_carregado, proba_carregado = carregado.predizer(textos)
+    np.testing.assert_array_equal(pred_carregado, pred_original)
+    np.testing.assert_array_equal(proba_carregado, proba_original)
+
+
+def test_round_trip_pickle(detector_padrao, tmp_path, gerar_emails):
+    textos, _ = gerar_emails(60, semente=1)
+    _verificar_round_trip(detector_padrao, 'pkl', tmp_path, textos)
+
+    with open(tmp_path / 'detector.pkl', 'rb') as f:
+        assert f.read(2) == bytes([pickle.PROTO[0], pickle.HIGHEST_PROTOCOL])
+
+
+def test_pickle_otimizado_igual_ao_sem_otimizacao(detector_padrao, tmp_path, gerar_emails):
+    otimizado, sem_otimizacao = str(tmp_path / 'otimizado.pkl'), str(tmp_path / 'bruto.pkl')
+    detector_padrao.salvar(otimizado)
+    detector_padrao.salvar(sem_otimizacao, otimizar_pickle=False)
+
+    # pickletools.optimize só remove PUTs não usados
+    assert os.path.getsize(otimizado) <= os.path.getsize(sem_otimizacao)
+
+    textos, _ = gerar_emails(20, semente=2)
+    np.testing.assert_array_equal(DetectorPhishing.carregar(otimizado).predizer(textos)[1],
+                                  DetectorPhishing.carregar(sem_otimizacao).predizer(textos)[1])
+
+
+def test_round_trip_pickle_zstd(detector_padrao, tmp_path, gerar_emails):
+    textos, _ = gerar_emails(60, semente=1)
+    _verificar_round_trip(detector_padrao, 'pkl.zst', tmp_path, textos)
+
+    with open(tmp_path / 'detector.pkl.zst', 'rb') as f:
+        assert f.read(len(MAGIC_ZSTD)) == MAGIC_ZSTD
+
+
+def test_round_trip_safetensors(detector_padrao, tmp_path, gerar_emails):
+    textos, _ = gerar_emails(60, semente=1)
+    _verificar_round_trip(detector_padrao, 'safetensors', tmp_path, textos)
+
+
+def test_safetensors_componentes_separados(detector_padrao, tmp_path, gerar_emails):
+    pytest.importorskip('safetensors')
+    caminho = str(tmp_path / 'detector.safetensors')
+    detector_padrao.salvar_safetensors(caminho)
+
+    # Texto e classificador carregados à parte (caches separados no app)
+    preprocessador, extrator = DetectorPhishing.carregar_componentes_texto(caminho)
+    scaler, modelo, metricas = DetectorPhishing.carregar_componentes_classificador(caminho)
+    detector = DetectorPhishing.de_componentes(preprocessador, extrator, scaler, modelo, metricas)
+
+    textos, _ = gerar_emails(20, semente=2)
+    np.testing.assert_array_equal(detector.predizer(textos)[1], detector_padrao.predizer(textos)[1])
+    np.testing.assert_array_equal(metricas['matriz_confusao'], detector_padrao.metricas['matriz_confusao'])
+
+
+@pytest.mark.parametrize('formato', ['pkl', 'safetensors'])
+def test_round_trip_hashing(detector_hashing, formato, tmp_path, gerar_emails):
+    textos, _ = gerar_emails(60, semente=1)
+    _verificar_round_trip(detector_hashing, formato, tmp_path, textos)
+
+
+@pytest.mark.parametrize('formato', ['pkl', 'safetensors'])
+def test_round_trip_incremental(detector_incremental, formato, tmp_path, gerar_emails):
+    textos, _ = gerar_emails(60, semente=1)
+    _verificar_round_trip(detector_incremental, formato, tmp_path, textos)
+
+
+@pytest.mark.filterwarnings('ignore::sklearn.exceptions.UndefinedMetricWarning')
+def test_incremental_com_validacao_de_uma_classe(gerar_emails):
+    # CSV ordenado por label: o primeiro lote (validação) só tem legítimos
+    textos, labels = gerar_emails(200, semente=3)
+    ordem = np.argsort(labels, kind='stable')
+    textos = [textos[i] for i in ordem]
+
+    detector = DetectorPhishing(max_features=500)
+    metricas = _silencioso(detector.treinar_incremental, textos, labels[ordem], tamanho_lote=50)
+
+    assert np.isnan(metricas['auc_roc'])
+    assert metricas['matriz_confusao'].shape == (2, 2)
@@ -0,0 +1,101 @@
+"""
+Testes de carregar_dataset: leitura do CSV (pyarrow e pandas devem dar o
+mesmo resultado), remoção de nulos, mapeamento das labels para 0/1 e o
+cache Parquet (relido igual ao que foi lido do CSV).
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from src import utils
+
+
+@pytest.fixture
+def csv_emails(tmp_path):
+    """CSV com nulos, label textual e email com quebra de linha entre aspas."""
+    caminho = tmp_path / 'emails.csv'
+    pd.DataFrame({
+        'Email Text': ['URGENT verify your account', None, 'Meeting at 10am\nsee you',
+                       'Click here to claim prize', 'Quarterly report attached', 'NA text'],
+        'Email Type': ['Phishing Email', 'Safe Email', 'Safe Email',
+                       'Phishing Email', None, 'Safe Email'],
+        'outra': range(6),
+    }).to_csv(caminho, index=False)
+    return str(caminho)
+
+
+def _carregar(caminho, usar_cache=True):
+    return utils.carregar_dataset(caminho, 'Email Text', 'Email Type', usar_cache=usar_cache)
+
+
+def test_carregar_dataset_csv(csv_emails):
+    textos, labels = _carregar(csv_emails, usar_cache=False)
+
+    assert textos.tolist() == ['URGENT verify your account', 'Meeting at 10am\nsee you',
+                               'Click here to claim prize', 'NA text']
+    assert labels.tolist() == [1, 0, 1, 0]
+    assert labels.index.tolist() == textos.index.tolist() == [0, 2, 3, 5]
+    assert labels.name == 'label_numeric'
+
+
+def test_labels_numericas_mantidas(tmp_path):
+    caminho = tmp_path / 'numericas.csv'
+    pd.DataFrame({'Email Text': ['a', 'b', 'c'], 'Email Type': [1, 0, 1]}).to_csv(caminho, index=False)
+
+    _, labels = _carregar(str(caminho), usar_cache=False)
+    assert labels.tolist() == [1, 0, 1]
+
+
+def test_coluna_inexistente(csv_emails):
+    with pytest.raises(KeyError):
+        utils.carregar_dataset(csv_emails, 'texto', 'Email Type', usar_cache=False)
+
+
+def test_leitor_pyarrow_igual_ao_pandas(csv_emails, monkeypatch):
+    pytest.importorskip('pyarrow')
+    textos_arrow, labels_arrow, total_arrow = utils._ler_colunas_csv_arrow(
+        csv_emails, 'Email Text', 'Email Type')
+
+    def sem_pyarrow(*args, **kwargs):
+        raise ImportError
+
+    monkeypatch.setattr(utils, '_ler_colunas_csv_arrow', sem_pyarrow)
+    textos_pandas, labels_pandas, total_pandas = utils._ler_colunas_csv(
+        csv_emails, 'Email Text', 'Email Type')
+
+    assert total_arrow == total_pandas == 6
+    assert textos_arrow.tolist() == textos_pandas.tolist()
+    assert textos_arrow.index.tolist() == textos_pandas.index.tolist()
+    assert labels_arrow.astype(str).tolist() == labels_pandas.astype(str).tolist()
+
+
+def test_cache_parquet_igual_ao_csv(csv_emails):
+    textos_csv, labels_csv = _carregar(csv_emails)
+    caminho_cache = utils._caminho_cache_dataset(csv_emails)
+    assert os.path.exists(caminho_cache)
+    assert os.path.dirname(caminho_cache) == utils.DIRETORIO_CACHE_DATASET
+
+    assert utils._ler_cache_dataset(csv_emails, 'Email Text', 'Email Type') is not None
+    textos_cache, labels_cache = _carregar(csv_emails)
+
+    pd.testing.assert_series_equal(textos_cache, textos_csv)
+    pd.testing.assert_series_equal(labels_cache, labels_csv)
+
+
+def test_cache_ignorado_para_outras_colunas(csv_emails):
+    _carregar(csv_emails)
+    assert utils._ler_cache_dataset(csv_emails, 'Email Text', 'outra') is None
+
+
+def test_sem_cache_nao_grava_parquet(csv_emails):
+    _carregar(csv_emails, usar_cache=False)
+    assert not os.path.exists(utils._caminho_cache_dataset(csv_emails))
+
+
+@pytest.mark.parametrize('usar_cache', [False, True])
+def test_labels_int8(csv_emails, usar_cache):
+    _carregar(csv_emails, usar_cache=usar_cache)  # com cache: a segunda leitura vem do Parquet
+    _, labels = _carregar(csv_emails, usar_cache=usar_cache)
+    assert labels.dtype == 'int8'
@@ -0,0 +1,67 @@
+"""
+Minifica o CSS da aplicação web (config.APP_CSS) e grava o resultado
+como literal bytes em config._APP_CSS_MIN.
+
+Uso:
+    python tools/minify_css.py
+"""
+
+import os
+import re
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(BASE_DIR, 'app')
+CONFIG_PATH = os.path.join(APP_DIR, 'config.py')
+
+INICIO_BLOCO = '# >>> gerado por tools/minify_css.py (não editar)\n'
+FIM_BLOCO = '# <<< fim do bloco gerado\n'
+
+try:
+    from csscompressor import compress
+except ImportError:
+    compress = None
+
+
+def minificar(css: str) -> str:
+    """
+    Minifica CSS com csscompressor; se não estiver instalado, usa uma
+    minificação simples (comentários, espaços e ';' finais).
+
+    Args:
+        css: CSS original
+
+    Returns:
+        CSS minificado
+    """
+    if compress is not None:
+        return compress(css)
+
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{}:;,>])\s*', r'\1', css)
+    css = css.replace(';}', '}')
+    return css.strip()
+
+
+def main():
+    sys.path.insert(0, APP_DIR)
+    import config
+
+    css_min = minificar(config.APP_CSS)
+
+    with open(CONFIG_PATH, encoding='utf-8') as f:
+        conteudo = f.read()
+
+    inicio = conteudo.index(INICIO_BLOCO) + len(INICIO_BLOCO)
+    fim = conteudo.index(FIM_BLOCO)
+    bloco = f"_APP_CSS_MIN = {css_min.encode('utf-8')!r}\n"
+
+    with open(CONFIG_PATH, 'w', encoding='utf-8') as f:
+        f.write(conteudo[:inicio] + bloco + conteudo[fim:])
+
+    print(f"✅ CSS minificado: {len(config.APP_CSS)} -> {len(css_min)} caracteres")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,8 @@ Execute este script após preparar o dataset em dados/emails.csv
 import os
 import sys
 import argparse
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Adicionar src ao path
@@ -23,6 +25,44 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def caminho_safetensors(caminho_modelo: str) -> str:
+    """
+    Caminho do .safetensors correspondente ao pickle, removendo as extensões
+    .zst e .pkl (modelo/x.pkl.zst -> modelo/x.safetensors).
+
+    Args:
+        caminho_modelo: Caminho do modelo salvo (.pkl ou .pkl.zst)
+
+    Returns:
+        Caminho do arquivo .safetensors
+    """
+    base, extensao = os.path.splitext(caminho_modelo)
+    while extensao in ('.zst', '.pkl'):
+        base, extensao = os.path.splitext(base)
+    return base + extensao + '.safetensors'
+
+
+def salvar_modelo_treinado(detector: DetectorPhishing, args: argparse.Namespace) -> None:
+    """
+    Salva o modelo treinado (pickle e safetensors + JSON).
+
+    Args:
+        detector: Detector treinado
+        args: Argumentos da linha de comando (output, no_optimize_pickle)
+    """
+    # Criar diretório se não existir
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+
+    detector.salvar(args.output, otimizar_pickle=not args.no_optimize_pickle)
+
+    # Verificar tamanho do arquivo
+    tamanho_mb = os.path.getsize(args.output) / (1024 * 1024)
+    logger.info(f"✅ Modelo salvo com sucesso! Tamanho: {tamanho_mb:.2f} MB")
+
+    # Salvar também em safetensors + JSON (carregamento rápido no app)
+    detector.salvar_safetensors(caminho_safetensors(args.output))
+
+
 def main():
     """
     Função principal de treinamento.
@@ -41,6 +81,12 @@ def main():
                         help='Número máximo de features TF-IDF')
     parser.add_argument('--test-size', type=float, default=0.2,
                         help='Proporção de dados para teste (0.0 a 1.0)')
+    parser.add_argument('--hashing', action='store_true',
+                        help='TF-IDF via HashingVectorizer (memória constante, sem vocabulário)')
+    parser.add_argument('--no-optimize-pickle', action='store_true',
+                        help='Não otimizar o pickle com pickletools (para depuração)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Não usar o cache Parquet do dataset (relê e reconverte o CSV)')
 
     # NOVO: Argumentos para colunas do CSV
     parser.add_argument('--coluna-texto', type=str, default='Email Text',
@@ -71,7 +117,8 @@ def main():
         textos, labels = carregar_dataset(
             args.dataset,
             coluna_texto=args.coluna_texto,
-            coluna_label=args.coluna_label
+            coluna_label=args.coluna_label,
+            usar_cache=not args.no_cache
         )
         logger.info(f"✅ Dataset carregado com sucesso!")
         logger.info(f"   Total de exemplos: {len(textos)}")
@@ -86,13 +133,15 @@ def main():
         logger.info("🚀 Inicializando detector de phishing...")
         detector = DetectorPhishing(
             idioma=args.idioma,
-            max_features=args.max_features
+            max_features=args.max_features,
+            usar_hashing=args.hashing
         )
 
         logger.info("🎓 Iniciando treinamento...\n")
+        # Series direto (sem .tolist()): o pipeline só itera os textos
         metricas = detector.treinar(
-            textos.tolist(),
-            labels.values,
+            textos,
+            labels.to_numpy(dtype=np.int8, copy=False),
             test_size=args.test_size,
             validacao_cruzada=True
         )
@@ -120,37 +169,31 @@ def main():
         traceback.print_exc()
         sys.exit(1)
 
-    # Salvar modelo
-    try:
-        logger.info(f"💾 Salvando modelo em: {args.output}")
-
-        # Criar diretório se não existir
-        os.makedirs(os.path.dirname(args.output), exist_ok=True)
-
-        detector.salvar(args.output)
+    exemplos_teste = [
+        ("URGENT! Click here to verify your account NOW!", "Phishing esperado"),
+        ("Hi team, meeting is scheduled for Tuesday.", "Legítimo esperado"),
+        ("You won $1,000,000! Send bank details.", "Phishing esperado"),
+        ("Please review the attached quarterly report.", "Legítimo esperado")
+    ]
 
-        # Verificar tamanho do arquivo
-        tamanho_mb = os.path.getsize(args.output) / (1024 * 1024)
-        logger.info(f"✅ Modelo salvo com sucesso! Tamanho: {tamanho_mb:.2f} MB")
+    # Salvar modelo em segundo plano (I/O) enquanto os exemplos são testados
+    logger.info(f"💾 Salvando modelo em: {args.output}")
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        salvamento = executor.submit(salvar_modelo_treinado, detector, args)
+        resultados = detector.analisar_emails([texto for texto, _ in exemplos_teste])
 
-    except Exception as e:
-        logger.error(f"❌ Erro ao salvar modelo: {e}")
-        sys.exit(1)
+        try:
+            salvamento.result()
+        except Exception as e:
+            logger.error(f"❌ Erro ao salvar modelo: {e}")
+            sys.exit(1)
 
     # Testar modelo com exemplos
     print("\n" + "=" * 70)
     print("🧪 TESTANDO MODELO COM EXEMPLOS")
     print("=" * 70 + "\n")
 
-    exemplos_teste = [
-        ("URGENT! Click here to verify your account NOW!", "Phishing esperado"),
-        ("Hi team, meeting is scheduled for Tuesday.", "Legítimo esperado"),
-        ("You won $1,000,000! Send bank details.", "Phishing esperado"),
-        ("Please review the attached quarterly report.", "Legítimo esperado")
-    ]
-
-    for texto, esperado in exemplos_teste:
-        resultado = detector.analisar_email(texto)
+    for (texto, esperado), resultado in zip(exemplos_teste, resultados):
         print(f"📧 Email: {texto[:50]}...")
         print(f"   Classificação: {resultado['classificacao']} ({esperado})")
         print(f"   Confiança: {resultado['confianca'] * 100:.1f}%")